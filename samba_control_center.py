@@ -8,51 +8,104 @@ Author: Claude | Version: 2.0 | Date: 2026-01-31
 
 import os
 import sys
+import stat
+import io
 import subprocess
 import shutil
+import socket
+import string
 import json
+import logging
+import gzip
+import hashlib
 import re
+import time
+import functools
+import tempfile
+import threading
+import contextlib
+import operator
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
 from datetime import datetime
-from typing import Dict, List, Tuple, Optional
-from dataclasses import dataclass, asdict
-from flask import Flask, request, render_template_string, jsonify, flash, redirect, url_for
+from typing import Dict, Iterator, List, Set, Tuple, Optional
+from dataclasses import dataclass
+from jinja2 import DictLoader, FileSystemBytecodeCache, ModuleLoader
+from markupsafe import Markup, escape
+from flask import Flask, Response, request, session, render_template, send_file, flash, redirect, url_for, abort
 
 try:
-    import configparser
+    import orjson  # Optional: faster JSON encoding for the API endpoints
 except ImportError:
-    print("❌ ERROR: configparser module not available")
-    sys.exit(1)
+    orjson = None
+
+try:
+    # Optional: read Samba users in-process instead of forking pdbedit
+    from samba import param as samba_param
+    from samba.samba3 import passdb as samba_passdb
+except ImportError:
+    samba_passdb = None
+
+try:
+    from flask_compress import Compress  # Optional: brotli/gzip response compression
+except ImportError:
+    Compress = None
+
+try:
+    from waitress import serve as waitress_serve  # Optional: production WSGI server
+except ImportError:
+    waitress_serve = None
 
 # =============================================================================
 # Configuration & Constants
 # =============================================================================
 
+logger = logging.getLogger('samba_control_center')
+
 app = Flask(__name__)
 app.secret_key = os.environ.get('SECRET_KEY', 'samba-control-2026-secret-key-change-me')
-app.config['DEBUG'] = True  # Enable debug for troubleshooting
+app.config['DEBUG'] = os.environ.get('SCC_DEBUG') == '1'  # SCC_DEBUG=1 for troubleshooting
+app.config['TEMPLATES_AUTO_RELOAD'] = app.config['DEBUG']
+app.jinja_env.auto_reload = app.config['DEBUG']
+# Drop the newline and indentation around block tags so they don't end up in the page
+app.jinja_env.trim_blocks = True
+app.jinja_env.lstrip_blocks = True
+
+VERSION = "2.0"
 
 SMB_CONF = "/etc/samba/smb.conf"
 BACKUP_DIR = "/etc/samba/backups"
 FSTAB = "/etc/fstab"
 CREDENTIALS_DIR = "/etc/samba/credentials"
+JINJA_CACHE_DIR = "/var/cache/samba_control_center/jinja"
+
+# Upper bound for pdbedit/smbpasswd/useradd, so a hung tool cannot pin a worker thread
+CMD_TIMEOUT = 15
+
+# Characters allowed in Unix/Samba usernames after the first one
+_USERNAME_CHARS = string.ascii_letters + string.digits + '_.-'
 
 # Ensure directories exist - with proper error handling
 def ensure_directories():
     """Create necessary directories if they don't exist"""
-    for directory in [BACKUP_DIR, CREDENTIALS_DIR]:
+    for directory, mode in [(BACKUP_DIR, 0o755), (CREDENTIALS_DIR, 0o700), (JINJA_CACHE_DIR, 0o700)]:
         try:
-            if os.path.exists(directory):
-                if not os.path.isdir(directory):
-                    print(f"⚠️  Warning: {directory} exists but is not a directory")
-                    # Try to use alternative
-                    if directory == CREDENTIALS_DIR:
-                        globals()['CREDENTIALS_DIR'] = "/tmp/samba_credentials"
-                        os.makedirs(CREDENTIALS_DIR, mode=0o700, exist_ok=True)
-            else:
-                os.makedirs(directory, mode=0o700 if directory == CREDENTIALS_DIR else 0o755, exist_ok=True)
+            # One stat() answers both "exists?" and "is it a directory?"
+            try:
+                is_dir = stat.S_ISDIR(os.stat(directory).st_mode)
+            except FileNotFoundError:
+                os.makedirs(directory, mode=mode, exist_ok=True)
+                continue
+            
+            if not is_dir:
+                logger.warning("%s exists but is not a directory", directory)
+                # Try to use alternative
+                if directory == CREDENTIALS_DIR:
+                    globals()['CREDENTIALS_DIR'] = "/tmp/samba_credentials"
+                    os.makedirs(CREDENTIALS_DIR, mode=0o700, exist_ok=True)
         except PermissionError:
-            print(f"⚠️  Warning: No permission to create {directory}")
+            logger.warning("No permission to create %s", directory)
             if directory == CREDENTIALS_DIR:
                 globals()['CREDENTIALS_DIR'] = "/tmp/samba_credentials"
                 try:
@@ -60,15 +113,43 @@ def ensure_directories():
                 except:
                     pass
         except Exception as e:
-            print(f"⚠️  Warning: Could not create {directory}: {e}")
+            logger.warning("Could not create %s: %s", directory, e)
 
 ensure_directories()
 
+def _valid_username(name: str, machine_account: bool = False) -> bool:
+    """True for names like 'alice', 'svc-backup' or 'john.doe' (no regex engine needed)
+    
+    With machine_account, one trailing '$' (Samba's 'PC01$' form) is accepted too.
+    """
+    if machine_account and name.endswith('$'):
+        name = name[:-1]
+    return (
+        bool(name) and name.isascii()
+        and (name[0] == '_' or name[0].isalpha())
+        and not name.strip(_USERNAME_CHARS)
+    )
+
+def _single_line(value: str) -> bool:
+    """True if value has no newlines or other control characters to break out of its smb.conf line
+    
+    Anything else is left to Samba, whose 'valid users' syntax (%U macros, DOMAIN+user,
+    @group, quoted names, ...) is far wider than a whitelist could follow.
+    """
+    return not any(ord(ch) < 32 or ord(ch) == 127 for ch in value)
+
+# Characters that cannot form HTML markup; values made only of these render as-is
+_HTML_INERT_CHARS = string.ascii_letters + string.digits + ' ._/-:'
+
+def _html_inert(value: str) -> str:
+    """Mark value as Markup when it has nothing to escape, so rendering skips escape() for it"""
+    return Markup(value) if not value.strip(_HTML_INERT_CHARS) else value
+
 # =============================================================================
 # Data Models
 # =============================================================================
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class SambaShare:
     name: str
     path: str
@@ -81,31 +162,568 @@ class SambaShare:
     directory_mask: str = "0775"
     
     def to_dict(self):
-        return asdict(self)
+        return {
+            'name': self.name,
+            'path': self.path,
+            'comment': self.comment,
+            'writable': self.writable,
+            'browseable': self.browseable,
+            'guest_ok': self.guest_ok,
+            'valid_users': self.valid_users,
+            'create_mask': self.create_mask,
+            'directory_mask': self.directory_mask
+        }
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class CifsMount:
     remote: str
     mountpoint: str
     fstype: str
     options: str
     credentials_file: Optional[str] = None
+    credentials_file_exists: bool = False
     is_mounted: bool = False
     
     def to_dict(self):
-        return asdict(self)
+        return {
+            'remote': self.remote,
+            'mountpoint': self.mountpoint,
+            'fstype': self.fstype,
+            'options': self.options,
+            'credentials_file': self.credentials_file,
+            'credentials_file_exists': self.credentials_file_exists,
+            'is_mounted': self.is_mounted
+        }
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class SambaUser:
     username: str
     is_enabled: bool = True
     unix_user_exists: bool = False
+    
+    def to_dict(self):
+        return {
+            'username': self.username,
+            'is_enabled': self.is_enabled,
+            'unix_user_exists': self.unix_user_exists
+        }
 
 # =============================================================================
 # HTML Template - Modern, Professional Design
 # =============================================================================
 
-HTML_TEMPLATE = """
+# Above-the-fold styles (layout, header, stats, cards), inlined so first paint needs no request
+CRITICAL_CSS = """
+:root {
+    --primary: #0A4D3C;
+    --primary-light: #0F6B54;
+    --primary-dark: #073529;
+    --accent: #F59E0B;
+    --accent-light: #FCD34D;
+    --bg-dark: #0F172A;
+    --bg-medium: #1E293B;
+    --bg-light: #334155;
+    --text-primary: #F8FAFC;
+    --text-secondary: #CBD5E1;
+    --text-muted: #94A3B8;
+    --border: #475569;
+    --success: #10B981;
+    --warning: #F59E0B;
+    --danger: #EF4444;
+    --info: #3B82F6;
+    --card-bg: rgba(30, 41, 59, 0.6);
+    --glass-bg: rgba(15, 23, 42, 0.7);
+}
+
+* {
+    margin: 0;
+    padding: 0;
+    box-sizing: border-box;
+}
+
+body {
+    font-family: 'IBM Plex Sans', -apple-system, BlinkMacSystemFont, sans-serif;
+    background: linear-gradient(135deg, #0F172A 0%, #1E293B 50%, #0A4D3C 100%);
+    background-attachment: fixed;
+    color: var(--text-primary);
+    min-height: 100vh;
+    line-height: 1.6;
+}
+
+.grain {
+    position: fixed;
+    top: 0;
+    left: 0;
+    width: 100%;
+    height: 100%;
+    pointer-events: none;
+    opacity: 0.03;
+    z-index: 1;
+    background-image: url('/assets/grain.svg');
+}
+
+.container {
+    max-width: 1400px;
+    margin: 0 auto;
+    padding: 2rem;
+    position: relative;
+    z-index: 2;
+}
+
+.header {
+    background: var(--glass-bg);
+    backdrop-filter: blur(20px);
+    border: 1px solid var(--border);
+    border-radius: 20px;
+    padding: 2.5rem;
+    margin-bottom: 2rem;
+    box-shadow: 0 20px 60px rgba(0, 0, 0, 0.4);
+    position: relative;
+    overflow: hidden;
+}
+
+.header::before {
+    content: '';
+    position: absolute;
+    top: 0;
+    left: 0;
+    right: 0;
+    height: 4px;
+    background: linear-gradient(90deg, var(--primary), var(--accent), var(--primary));
+    background-size: 200% 100%;
+    animation: shimmer 3s linear infinite;
+}
+
+@keyframes shimmer {
+    0% { background-position: -200% 0; }
+    100% { background-position: 200% 0; }
+}
+
+.header h1, .stat-value {
+    font-size: 2.5rem;
+    font-weight: 700;
+    background: linear-gradient(135deg, var(--text-primary), var(--accent-light));
+    -webkit-background-clip: text;
+    -webkit-text-fill-color: transparent;
+    background-clip: text;
+}
+
+.header h1 {
+    margin-bottom: 0.5rem;
+}
+
+.header .subtitle {
+    color: var(--text-secondary);
+    font-size: 1rem;
+    display: flex;
+    align-items: center;
+    gap: 1rem;
+    flex-wrap: wrap;
+}
+
+.badge {
+    display: inline-flex;
+    align-items: center;
+    gap: 0.5rem;
+    padding: 0.4rem 0.9rem;
+    border-radius: 8px;
+    font-size: 0.85rem;
+    font-weight: 600;
+    font-family: 'JetBrains Mono', monospace;
+}
+
+.badge.success {
+    background: rgba(16, 185, 129, 0.15);
+    color: var(--success);
+    border: 1px solid rgba(16, 185, 129, 0.3);
+}
+
+.badge.warning {
+    background: rgba(245, 158, 11, 0.15);
+    color: var(--warning);
+    border: 1px solid rgba(245, 158, 11, 0.3);
+}
+
+.badge.info {
+    background: rgba(59, 130, 246, 0.15);
+    color: var(--info);
+    border: 1px solid rgba(59, 130, 246, 0.3);
+}
+
+.card {
+    background: var(--card-bg);
+    backdrop-filter: blur(10px);
+    border: 1px solid var(--border);
+    border-radius: 16px;
+    padding: 1.75rem;
+    margin-bottom: 1.5rem;
+    box-shadow: 0 10px 40px rgba(0, 0, 0, 0.3);
+    transition: transform 0.2s, box-shadow 0.2s;
+}
+
+.card:hover {
+    transform: translateY(-2px);
+    box-shadow: 0 15px 50px rgba(0, 0, 0, 0.4);
+}
+
+.card-header {
+    display: flex;
+    align-items: center;
+    justify-content: space-between;
+    margin-bottom: 1.5rem;
+    padding-bottom: 1rem;
+    border-bottom: 1px solid var(--border);
+}
+
+.card-title {
+    font-size: 1.25rem;
+    font-weight: 600;
+    display: flex;
+    align-items: center;
+    gap: 0.75rem;
+    color: var(--text-primary);
+}
+
+.card-title i {
+    color: var(--accent);
+    font-size: 1.4rem;
+}
+
+.grid {
+    display: grid;
+    gap: 1.5rem;
+}
+
+.grid-2 {
+    grid-template-columns: repeat(auto-fit, minmax(500px, 1fr));
+}
+
+.grid-3 {
+    grid-template-columns: repeat(auto-fit, minmax(350px, 1fr));
+}
+
+@media (max-width: 768px) {
+    .grid-2, .grid-3 {
+        grid-template-columns: 1fr;
+    }
+}
+
+.stats-grid {
+    display: grid;
+    grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
+    gap: 1rem;
+    margin-bottom: 2rem;
+}
+
+.stat-card {
+    background: var(--glass-bg);
+    backdrop-filter: blur(10px);
+    border: 1px solid var(--border);
+    border-radius: 12px;
+    padding: 1.5rem;
+    text-align: center;
+}
+
+.stat-label {
+    color: var(--text-secondary);
+    font-size: 0.9rem;
+    margin-top: 0.5rem;
+}
+
+/* Modals must stay hidden before app.css arrives */
+.modal {
+    display: none;
+    position: fixed;
+    top: 0;
+    left: 0;
+    width: 100%;
+    height: 100%;
+    background: rgba(0, 0, 0, 0.7);
+    backdrop-filter: blur(5px);
+    z-index: 1000;
+    align-items: center;
+    justify-content: center;
+}
+
+.modal.active {
+    display: flex;
+}
+"""
+
+# Remaining dashboard styles, served as asset_url('app.css') and loaded without blocking render
+STYLESHEET = """
+.alert {
+    padding: 1rem 1.25rem;
+    border-radius: 12px;
+    margin-bottom: 1.5rem;
+    display: flex;
+    align-items: center;
+    gap: 1rem;
+    animation: slideIn 0.3s ease-out;
+    border: 1px solid;
+}
+
+@keyframes slideIn {
+    from {
+        opacity: 0;
+        transform: translateY(-10px);
+    }
+    to {
+        opacity: 1;
+        transform: translateY(0);
+    }
+}
+
+.alert-success, .status-mounted {
+    background: rgba(16, 185, 129, 0.15);
+    border-color: rgba(16, 185, 129, 0.3);
+    color: var(--success);
+}
+
+.alert-danger {
+    background: rgba(239, 68, 68, 0.15);
+    border-color: rgba(239, 68, 68, 0.3);
+    color: var(--danger);
+}
+
+.alert-info {
+    background: rgba(59, 130, 246, 0.15);
+    border-color: rgba(59, 130, 246, 0.3);
+    color: var(--info);
+}
+
+.alert i {
+    font-size: 1.2rem;
+}
+
+.form-group {
+    margin-bottom: 1.25rem;
+}
+
+.form-label {
+    display: block;
+    margin-bottom: 0.5rem;
+    font-weight: 500;
+    color: var(--text-secondary);
+    font-size: 0.9rem;
+}
+
+.form-control, .form-select {
+    width: 100%;
+    padding: 0.75rem 1rem;
+    background: var(--bg-medium);
+    border: 1px solid var(--border);
+    border-radius: 10px;
+    color: var(--text-primary);
+    font-size: 0.95rem;
+    font-family: 'IBM Plex Sans', sans-serif;
+    transition: all 0.2s;
+}
+
+.form-control:focus, .form-select:focus {
+    outline: none;
+    border-color: var(--primary-light);
+    box-shadow: 0 0 0 3px rgba(15, 107, 84, 0.2);
+}
+
+.form-control::placeholder {
+    color: var(--text-muted);
+}
+
+.btn {
+    padding: 0.75rem 1.5rem;
+    border: none;
+    border-radius: 10px;
+    font-weight: 600;
+    font-size: 0.95rem;
+    cursor: pointer;
+    transition: all 0.2s;
+    display: inline-flex;
+    align-items: center;
+    gap: 0.5rem;
+    text-decoration: none;
+    font-family: 'IBM Plex Sans', sans-serif;
+}
+
+.btn:hover {
+    transform: translateY(-2px);
+    box-shadow: 0 6px 20px rgba(0, 0, 0, 0.3);
+}
+
+.btn:active {
+    transform: translateY(0);
+}
+
+.btn-primary, .btn-success, .btn-danger, .btn-warning {
+    color: white;
+}
+
+.btn-primary {
+    background: linear-gradient(135deg, var(--primary), var(--primary-light));
+}
+
+.btn-success {
+    background: linear-gradient(135deg, #059669, var(--success));
+}
+
+.btn-danger {
+    background: linear-gradient(135deg, #DC2626, var(--danger));
+}
+
+.btn-warning {
+    background: linear-gradient(135deg, #D97706, var(--warning));
+}
+
+.btn-secondary {
+    background: var(--bg-light);
+    color: var(--text-primary);
+    border: 1px solid var(--border);
+}
+
+.btn-sm {
+    padding: 0.5rem 1rem;
+    font-size: 0.85rem;
+}
+
+.btn-lg {
+    padding: 1rem 2rem;
+    font-size: 1.05rem;
+}
+
+.table {
+    width: 100%;
+    border-collapse: collapse;
+    font-size: 0.9rem;
+}
+
+.table thead {
+    background: var(--bg-light);
+}
+
+.table th {
+    padding: 0.9rem 1rem;
+    text-align: left;
+    font-weight: 600;
+    color: var(--text-secondary);
+    border-bottom: 2px solid var(--border);
+}
+
+.table td {
+    padding: 0.9rem 1rem;
+    border-bottom: 1px solid var(--border);
+}
+
+.table tbody tr {
+    transition: background 0.2s;
+}
+
+.table tbody tr:hover {
+    background: rgba(255, 255, 255, 0.03);
+}
+
+.status-indicator {
+    display: inline-flex;
+    align-items: center;
+    gap: 0.5rem;
+    padding: 0.35rem 0.75rem;
+    border-radius: 6px;
+    font-size: 0.8rem;
+    font-weight: 600;
+}
+
+.status-unmounted {
+    background: rgba(148, 163, 184, 0.15);
+    color: var(--text-muted);
+}
+
+code, pre {
+    background: var(--bg-dark);
+    font-family: 'JetBrains Mono', monospace;
+    font-size: 0.85rem;
+}
+
+code {
+    padding: 0.2rem 0.5rem;
+    border-radius: 4px;
+    color: var(--accent-light);
+}
+
+pre {
+    padding: 1.25rem;
+    border-radius: 10px;
+    overflow-x: auto;
+    border: 1px solid var(--border);
+    line-height: 1.6;
+    max-height: 400px;
+    overflow-y: auto;
+}
+
+.action-bar {
+    display: flex;
+    gap: 1rem;
+    flex-wrap: wrap;
+    margin-top: 1.5rem;
+    padding-top: 1.5rem;
+    border-top: 1px solid var(--border);
+}
+
+.empty-state {
+    text-align: center;
+    padding: 3rem 1rem;
+    color: var(--text-muted);
+}
+
+.empty-state i {
+    font-size: 3rem;
+    margin-bottom: 1rem;
+    opacity: 0.5;
+}
+
+.footer {
+    text-align: center;
+    margin-top: 3rem;
+    padding: 2rem;
+    color: var(--text-muted);
+    font-size: 0.85rem;
+}
+
+.modal-content {
+    background: var(--bg-medium);
+    border: 1px solid var(--border);
+    border-radius: 16px;
+    padding: 2rem;
+    max-width: 600px;
+    width: 90%;
+    max-height: 90vh;
+    overflow-y: auto;
+}
+
+.close-modal {
+    float: right;
+    font-size: 1.5rem;
+    cursor: pointer;
+    color: var(--text-muted);
+}
+
+.close-modal:hover {
+    color: var(--text-primary);
+}
+
+@keyframes pulse {
+    0%, 100% { opacity: 1; }
+    50% { opacity: 0.5; }
+}
+
+.loading {
+    animation: pulse 2s ease-in-out infinite;
+}
+"""
+
+# Film-grain noise texture behind the page, served as asset_url('grain.svg')
+GRAIN_SVG = """<svg viewBox='0 0 400 400' xmlns='http://www.w3.org/2000/svg'><filter id='noiseFilter'><feTurbulence type='fractalNoise' baseFrequency='0.9' numOctaves='4' stitchTiles='stitch'/></filter><rect width='100%' height='100%' filter='url(#noiseFilter)'/></svg>"""
+
+# Page layout: <head> and scripts shared by every page
+BASE_TEMPLATE = """
 <!DOCTYPE html>
 <html lang="cs">
 <head>
@@ -114,523 +732,131 @@ HTML_TEMPLATE = """
     <title>Samba Control Center</title>
     <link rel="preconnect" href="https://fonts.googleapis.com">
     <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
-    <link href="https://fonts.googleapis.com/css2?family=IBM+Plex+Sans:wght@400;500;600;700&family=JetBrains+Mono:wght@400;600&display=swap" rel="stylesheet">
-    <link href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.5.0/css/all.min.css" rel="stylesheet">
-    <style>
-        :root {
-            --primary: #0A4D3C;
-            --primary-light: #0F6B54;
-            --primary-dark: #073529;
-            --accent: #F59E0B;
-            --accent-light: #FCD34D;
-            --bg-dark: #0F172A;
-            --bg-medium: #1E293B;
-            --bg-light: #334155;
-            --text-primary: #F8FAFC;
-            --text-secondary: #CBD5E1;
-            --text-muted: #94A3B8;
-            --border: #475569;
-            --success: #10B981;
-            --warning: #F59E0B;
-            --danger: #EF4444;
-            --info: #3B82F6;
-            --card-bg: rgba(30, 41, 59, 0.6);
-            --glass-bg: rgba(15, 23, 42, 0.7);
-        }
-        
-        * {
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }
-        
-        body {
-            font-family: 'IBM Plex Sans', -apple-system, BlinkMacSystemFont, sans-serif;
-            background: linear-gradient(135deg, #0F172A 0%, #1E293B 50%, #0A4D3C 100%);
-            background-attachment: fixed;
-            color: var(--text-primary);
-            min-height: 100vh;
-            line-height: 1.6;
-        }
-        
-        .grain {
-            position: fixed;
-            top: 0;
-            left: 0;
-            width: 100%;
-            height: 100%;
-            pointer-events: none;
-            opacity: 0.03;
-            z-index: 1;
-            background-image: url("data:image/svg+xml,%3Csvg viewBox='0 0 400 400' xmlns='http://www.w3.org/2000/svg'%3E%3Cfilter id='noiseFilter'%3E%3CfeTurbulence type='fractalNoise' baseFrequency='0.9' numOctaves='4' stitchTiles='stitch'/%3E%3C/filter%3E%3Crect width='100%25' height='100%25' filter='url(%23noiseFilter)'/%3E%3C/svg%3E");
-        }
-        
-        .container {
-            max-width: 1400px;
-            margin: 0 auto;
-            padding: 2rem;
-            position: relative;
-            z-index: 2;
-        }
-        
-        .header {
-            background: var(--glass-bg);
-            backdrop-filter: blur(20px);
-            border: 1px solid var(--border);
-            border-radius: 20px;
-            padding: 2.5rem;
-            margin-bottom: 2rem;
-            box-shadow: 0 20px 60px rgba(0, 0, 0, 0.4);
-            position: relative;
-            overflow: hidden;
-        }
-        
-        .header::before {
-            content: '';
-            position: absolute;
-            top: 0;
-            left: 0;
-            right: 0;
-            height: 4px;
-            background: linear-gradient(90deg, var(--primary), var(--accent), var(--primary));
-            background-size: 200% 100%;
-            animation: shimmer 3s linear infinite;
-        }
-        
-        @keyframes shimmer {
-            0% { background-position: -200% 0; }
-            100% { background-position: 200% 0; }
-        }
-        
-        .header h1 {
-            font-size: 2.5rem;
-            font-weight: 700;
-            margin-bottom: 0.5rem;
-            background: linear-gradient(135deg, var(--text-primary), var(--accent-light));
-            -webkit-background-clip: text;
-            -webkit-text-fill-color: transparent;
-            background-clip: text;
-        }
-        
-        .header .subtitle {
-            color: var(--text-secondary);
-            font-size: 1rem;
-            display: flex;
-            align-items: center;
-            gap: 1rem;
-            flex-wrap: wrap;
-        }
-        
-        .badge {
-            display: inline-flex;
-            align-items: center;
-            gap: 0.5rem;
-            padding: 0.4rem 0.9rem;
-            border-radius: 8px;
-            font-size: 0.85rem;
-            font-weight: 600;
-            font-family: 'JetBrains Mono', monospace;
-        }
-        
-        .badge.success {
-            background: rgba(16, 185, 129, 0.15);
-            color: var(--success);
-            border: 1px solid rgba(16, 185, 129, 0.3);
-        }
-        
-        .badge.warning {
-            background: rgba(245, 158, 11, 0.15);
-            color: var(--warning);
-            border: 1px solid rgba(245, 158, 11, 0.3);
-        }
-        
-        .badge.info {
-            background: rgba(59, 130, 246, 0.15);
-            color: var(--info);
-            border: 1px solid rgba(59, 130, 246, 0.3);
-        }
-        
-        .alert {
-            padding: 1rem 1.25rem;
-            border-radius: 12px;
-            margin-bottom: 1.5rem;
-            display: flex;
-            align-items: center;
-            gap: 1rem;
-            animation: slideIn 0.3s ease-out;
-            border: 1px solid;
-        }
-        
-        @keyframes slideIn {
-            from {
-                opacity: 0;
-                transform: translateY(-10px);
+    <link rel="preconnect" href="https://cdnjs.cloudflare.com" crossorigin>
+    <style>{{ critical_css }}</style>
+    {% for href in [asset_url('app.css'), font_css, icon_css] %}
+    <link rel="preload" href="{{ href }}" as="style" onload="this.onload=null;this.rel='stylesheet'">
+    <noscript><link rel="stylesheet" href="{{ href }}"></noscript>
+    {% endfor %}
+</head>
+<body>
+    <div class="grain"></div>
+{% block content %}{% endblock %}
+    <script>
+        function showModal(id) {
+            document.getElementById(id).classList.add('active');
+            
+            // When opening Add Mount modal, pre-select the SMB version
+            if (id === 'addMountModal') {
+                const smbVersionMap = {
+                    'smb1': 'smbfs',
+                    'smb2': 'smb',
+                    'smb3': 'smb3'
+                };
+                const version = window.selectedSMBVersion || document.getElementById('currentSMBVersion').dataset.version;
+                const fstype = smbVersionMap[version] || 'cifs';
+                const select = document.querySelector('#addMountModal select[name="fstype"]');
+                if (select) {
+                    select.value = fstype;
+                }
             }
-            to {
-                opacity: 1;
-                transform: translateY(0);
+            
+            // The raw config is only downloaded when somebody opens it
+            if (id === 'configModal') {
+                const pre = document.getElementById('configContent');
+                fetch("{{ url_for('config_raw') }}", {cache: 'no-cache'})
+                    .then(r => r.text())
+                    .then(text => { pre.textContent = text; })
+                    .catch(err => { pre.textContent = 'Error reading config: ' + err; });
             }
         }
         
-        .alert-success {
-            background: rgba(16, 185, 129, 0.15);
-            border-color: rgba(16, 185, 129, 0.3);
-            color: var(--success);
-        }
-        
-        .alert-danger {
-            background: rgba(239, 68, 68, 0.15);
-            border-color: rgba(239, 68, 68, 0.3);
-            color: var(--danger);
-        }
-        
-        .alert-info {
-            background: rgba(59, 130, 246, 0.15);
-            border-color: rgba(59, 130, 246, 0.3);
-            color: var(--info);
-        }
-        
-        .alert i {
-            font-size: 1.2rem;
-        }
-        
-        .card {
-            background: var(--card-bg);
-            backdrop-filter: blur(10px);
-            border: 1px solid var(--border);
-            border-radius: 16px;
-            padding: 1.75rem;
-            margin-bottom: 1.5rem;
-            box-shadow: 0 10px 40px rgba(0, 0, 0, 0.3);
-            transition: transform 0.2s, box-shadow 0.2s;
-        }
-        
-        .card:hover {
-            transform: translateY(-2px);
-            box-shadow: 0 15px 50px rgba(0, 0, 0, 0.4);
-        }
-        
-        .card-header {
-            display: flex;
-            align-items: center;
-            justify-content: space-between;
-            margin-bottom: 1.5rem;
-            padding-bottom: 1rem;
-            border-bottom: 1px solid var(--border);
-        }
-        
-        .card-title {
-            font-size: 1.25rem;
-            font-weight: 600;
-            display: flex;
-            align-items: center;
-            gap: 0.75rem;
-            color: var(--text-primary);
-        }
-        
-        .card-title i {
-            color: var(--accent);
-            font-size: 1.4rem;
-        }
-        
-        .grid {
-            display: grid;
-            gap: 1.5rem;
-        }
-        
-        .grid-2 {
-            grid-template-columns: repeat(auto-fit, minmax(500px, 1fr));
-        }
-        
-        .grid-3 {
-            grid-template-columns: repeat(auto-fit, minmax(350px, 1fr));
+        function closeModal(id) {
+            document.getElementById(id).classList.remove('active');
         }
         
-        @media (max-width: 768px) {
-            .grid-2, .grid-3 {
-                grid-template-columns: 1fr;
+        function selectSMBVersion(version) {
+            window.selectedSMBVersion = version;
+            document.cookie = 'smb_version=' + version + '; path=/; max-age=31536000; SameSite=Lax';
+            
+            // Update visual selection
+            const cards = document.querySelectorAll('.card[onclick^="selectSMBVersion"]');
+            cards.forEach(card => {
+                card.style.border = '2px solid var(--border)';
+                card.style.boxShadow = 'none';
+            });
+            
+            const selectedCard = document.querySelector(`[onclick="selectSMBVersion('${version}')"]`);
+            if (!selectedCard) {
+                return;
             }
+            selectedCard.style.border = '2px solid var(--accent)';
+            selectedCard.style.boxShadow = '0 0 20px rgba(245, 158, 11, 0.3)';
+            
+            // Update text
+            const versionName = selectedCard.dataset.selectedLabel;
+            const currentVersionSpan = document.getElementById('currentSMBVersion');
+            currentVersionSpan.textContent = versionName;
+            currentVersionSpan.dataset.version = version;
+            
+            // Show notification
+            const notification = document.createElement('div');
+            notification.className = 'alert alert-success';
+            notification.innerHTML = `
+                <i class="fas fa-check-circle"></i>
+                <span>${versionName} selected! This will be used for new mounts.</span>
+            `;
+            notification.style.position = 'fixed';
+            notification.style.top = '20px';
+            notification.style.right = '20px';
+            notification.style.zIndex = '10000';
+            notification.style.animation = 'slideIn 0.3s ease-out';
+            document.body.appendChild(notification);
+            
+            setTimeout(() => {
+                notification.style.opacity = '0';
+                notification.style.transition = 'opacity 0.5s';
+                setTimeout(() => notification.remove(), 500);
+            }, 2000);
         }
         
-        .form-group {
-            margin-bottom: 1.25rem;
-        }
-        
-        .form-label {
-            display: block;
-            margin-bottom: 0.5rem;
-            font-weight: 500;
-            color: var(--text-secondary);
-            font-size: 0.9rem;
-        }
-        
-        .form-control, .form-select {
-            width: 100%;
-            padding: 0.75rem 1rem;
-            background: var(--bg-medium);
-            border: 1px solid var(--border);
-            border-radius: 10px;
-            color: var(--text-primary);
-            font-size: 0.95rem;
-            font-family: 'IBM Plex Sans', sans-serif;
-            transition: all 0.2s;
-        }
-        
-        .form-control:focus, .form-select:focus {
-            outline: none;
-            border-color: var(--primary-light);
-            box-shadow: 0 0 0 3px rgba(15, 107, 84, 0.2);
-        }
-        
-        .form-control::placeholder {
-            color: var(--text-muted);
-        }
-        
-        .btn {
-            padding: 0.75rem 1.5rem;
-            border: none;
-            border-radius: 10px;
-            font-weight: 600;
-            font-size: 0.95rem;
-            cursor: pointer;
-            transition: all 0.2s;
-            display: inline-flex;
-            align-items: center;
-            gap: 0.5rem;
-            text-decoration: none;
-            font-family: 'IBM Plex Sans', sans-serif;
-        }
-        
-        .btn:hover {
-            transform: translateY(-2px);
-            box-shadow: 0 6px 20px rgba(0, 0, 0, 0.3);
-        }
-        
-        .btn:active {
-            transform: translateY(0);
-        }
-        
-        .btn-primary {
-            background: linear-gradient(135deg, var(--primary), var(--primary-light));
-            color: white;
-        }
-        
-        .btn-success {
-            background: linear-gradient(135deg, #059669, var(--success));
-            color: white;
-        }
-        
-        .btn-danger {
-            background: linear-gradient(135deg, #DC2626, var(--danger));
-            color: white;
-        }
-        
-        .btn-warning {
-            background: linear-gradient(135deg, #D97706, var(--warning));
-            color: white;
-        }
-        
-        .btn-secondary {
-            background: var(--bg-light);
-            color: var(--text-primary);
-            border: 1px solid var(--border);
-        }
-        
-        .btn-sm {
-            padding: 0.5rem 1rem;
-            font-size: 0.85rem;
-        }
-        
-        .btn-lg {
-            padding: 1rem 2rem;
-            font-size: 1.05rem;
-        }
-        
-        .table {
-            width: 100%;
-            border-collapse: collapse;
-            font-size: 0.9rem;
-        }
-        
-        .table thead {
-            background: var(--bg-light);
-        }
-        
-        .table th {
-            padding: 0.9rem 1rem;
-            text-align: left;
-            font-weight: 600;
-            color: var(--text-secondary);
-            border-bottom: 2px solid var(--border);
-        }
-        
-        .table td {
-            padding: 0.9rem 1rem;
-            border-bottom: 1px solid var(--border);
-        }
-        
-        .table tbody tr {
-            transition: background 0.2s;
-        }
-        
-        .table tbody tr:hover {
-            background: rgba(255, 255, 255, 0.03);
-        }
-        
-        .status-indicator {
-            display: inline-flex;
-            align-items: center;
-            gap: 0.5rem;
-            padding: 0.35rem 0.75rem;
-            border-radius: 6px;
-            font-size: 0.8rem;
-            font-weight: 600;
-        }
-        
-        .status-mounted {
-            background: rgba(16, 185, 129, 0.15);
-            color: var(--success);
-        }
-        
-        .status-unmounted {
-            background: rgba(148, 163, 184, 0.15);
-            color: var(--text-muted);
-        }
-        
-        code {
-            background: var(--bg-dark);
-            padding: 0.2rem 0.5rem;
-            border-radius: 4px;
-            font-family: 'JetBrains Mono', monospace;
-            font-size: 0.85rem;
-            color: var(--accent-light);
-        }
-        
-        pre {
-            background: var(--bg-dark);
-            padding: 1.25rem;
-            border-radius: 10px;
-            overflow-x: auto;
-            border: 1px solid var(--border);
-            font-family: 'JetBrains Mono', monospace;
-            font-size: 0.85rem;
-            line-height: 1.6;
-            max-height: 400px;
-            overflow-y: auto;
-        }
-        
-        .stats-grid {
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
-            gap: 1rem;
-            margin-bottom: 2rem;
-        }
-        
-        .stat-card {
-            background: var(--glass-bg);
-            backdrop-filter: blur(10px);
-            border: 1px solid var(--border);
-            border-radius: 12px;
-            padding: 1.5rem;
-            text-align: center;
-        }
-        
-        .stat-value {
-            font-size: 2.5rem;
-            font-weight: 700;
-            background: linear-gradient(135deg, var(--text-primary), var(--accent-light));
-            -webkit-background-clip: text;
-            -webkit-text-fill-color: transparent;
-            background-clip: text;
-        }
-        
-        .stat-label {
-            color: var(--text-secondary);
-            font-size: 0.9rem;
-            margin-top: 0.5rem;
-        }
-        
-        .action-bar {
-            display: flex;
-            gap: 1rem;
-            flex-wrap: wrap;
-            margin-top: 1.5rem;
-            padding-top: 1.5rem;
-            border-top: 1px solid var(--border);
-        }
-        
-        .empty-state {
-            text-align: center;
-            padding: 3rem 1rem;
-            color: var(--text-muted);
-        }
-        
-        .empty-state i {
-            font-size: 3rem;
-            margin-bottom: 1rem;
-            opacity: 0.5;
-        }
-        
-        .footer {
-            text-align: center;
-            margin-top: 3rem;
-            padding: 2rem;
-            color: var(--text-muted);
-            font-size: 0.85rem;
-        }
-        
-        .modal {
-            display: none;
-            position: fixed;
-            top: 0;
-            left: 0;
-            width: 100%;
-            height: 100%;
-            background: rgba(0, 0, 0, 0.7);
-            backdrop-filter: blur(5px);
-            z-index: 1000;
-            align-items: center;
-            justify-content: center;
-        }
-        
-        .modal.active {
-            display: flex;
-        }
-        
-        .modal-content {
-            background: var(--bg-medium);
-            border: 1px solid var(--border);
-            border-radius: 16px;
-            padding: 2rem;
-            max-width: 600px;
-            width: 90%;
-            max-height: 90vh;
-            overflow-y: auto;
-        }
-        
-        .close-modal {
-            float: right;
-            font-size: 1.5rem;
-            cursor: pointer;
-            color: var(--text-muted);
-        }
-        
-        .close-modal:hover {
-            color: var(--text-primary);
+        function setMountOption(option) {
+            const input = document.getElementById('mountOptions');
+            const current = input.value.trim();
+            if (current) {
+                // Add to existing options
+                input.value = current + ',' + option;
+            } else {
+                // Set as first option
+                input.value = option;
+            }
         }
         
-        @keyframes pulse {
-            0%, 100% { opacity: 1; }
-            50% { opacity: 0.5; }
+        // Close modal when clicking outside
+        window.onclick = function(event) {
+            if (event.target.classList.contains('modal')) {
+                event.target.classList.remove('active');
+            }
         }
         
-        .loading {
-            animation: pulse 2s ease-in-out infinite;
-        }
-    </style>
-</head>
-<body>
-    <div class="grain"></div>
+        // Auto-dismiss alerts after 5 seconds
+        setTimeout(function() {
+            const alerts = document.querySelectorAll('.alert');
+            alerts.forEach(alert => {
+                alert.style.transition = 'opacity 0.5s';
+                alert.style.opacity = '0';
+                setTimeout(() => alert.remove(), 500);
+            });
+        }, 5000);
+    </script>
+</body>
+</html>
+"""
+
+# Dashboard body, rendered into BASE_TEMPLATE
+HTML_TEMPLATE = """
+{% extends 'base.html' %}
+{% block content %}
     <div class="container">
         
         <!-- Header -->
@@ -646,6 +872,12 @@ HTML_TEMPLATE = """
                     <i class="fas fa-microchip"></i>
                     {{ system_info.hostname }}
                 </span>
+                {% if system_info.samba_version %}
+                <span class="badge info">
+                    <i class="fas fa-tag"></i>
+                    Samba {{ system_info.samba_version }}
+                </span>
+                {% endif %}
             </div>
         </div>
 
@@ -681,61 +913,21 @@ HTML_TEMPLATE = """
             </div>
         </div>
 
-        <!-- Main Content Grid -->
-        <div class="grid grid-2">
-            
-            <!-- Samba Shares -->
-            <div class="card">
-                <div class="card-header">
-                    <div class="card-title">
-                        <i class="fas fa-folder-open"></i>
-                        Samba Shares
-                    </div>
-                    <button class="btn btn-primary btn-sm" onclick="showModal('addShareModal')">
-                        <i class="fas fa-plus"></i> Add Share
-                    </button>
-                </div>
-                {% if shares %}
-                    <table class="table">
-                        <thead>
-                            <tr>
-                                <th>Share Name</th>
-                                <th>Path</th>
-                                <th>Access</th>
-                                <th>Actions</th>
-                            </tr>
-                        </thead>
-                        <tbody>
-                            {% for share in shares %}
-                                <tr>
-                                    <td><strong>{{ share.name }}</strong></td>
-                                    <td><code>{{ share.path }}</code></td>
-                                    <td>
-                                        {% if share.writable %}
-                                            <span class="badge success">RW</span>
-                                        {% else %}
-                                            <span class="badge info">RO</span>
-                                        {% endif %}
-                                    </td>
-                                    <td>
-                                        <form method="post" style="display:inline;">
-                                            <input type="hidden" name="action" value="delete_share">
-                                            <input type="hidden" name="share_name" value="{{ share.name }}">
-                                            <button type="submit" class="btn btn-danger btn-sm" onclick="return confirm('Delete share [{{ share.name }}]?')">
-                                                <i class="fas fa-trash"></i>
-                                            </button>
-                                        </form>
-                                    </td>
-                                </tr>
-                            {% endfor %}
-                        </tbody>
-                    </table>
-                {% else %}
-                    <div class="empty-state">
+        <!-- Main Content Grid -->
+        <div class="grid grid-2">
+            
+            <!-- Samba Shares -->
+            <div class="card">
+                <div class="card-header">
+                    <div class="card-title">
                         <i class="fas fa-folder-open"></i>
-                        <p>No shares configured</p>
+                        Samba Shares
                     </div>
-                {% endif %}
+                    <button class="btn btn-primary btn-sm" onclick="showModal('addShareModal')">
+                        <i class="fas fa-plus"></i> Add Share
+                    </button>
+                </div>
+                {% include 'shares_table.html' %}
             </div>
 
             <!-- Samba Users -->
@@ -749,45 +941,7 @@ HTML_TEMPLATE = """
                         <i class="fas fa-user-plus"></i> Add User
                     </button>
                 </div>
-                {% if users %}
-                    <table class="table">
-                        <thead>
-                            <tr>
-                                <th>Username</th>
-                                <th>Status</th>
-                                <th>Actions</th>
-                            </tr>
-                        </thead>
-                        <tbody>
-                            {% for user in users %}
-                                <tr>
-                                    <td><strong>{{ user.username }}</strong></td>
-                                    <td>
-                                        {% if user.is_enabled %}
-                                            <span class="badge success">Enabled</span>
-                                        {% else %}
-                                            <span class="badge warning">Disabled</span>
-                                        {% endif %}
-                                    </td>
-                                    <td>
-                                        <form method="post" style="display:inline;">
-                                            <input type="hidden" name="action" value="delete_user">
-                                            <input type="hidden" name="username" value="{{ user.username }}">
-                                            <button type="submit" class="btn btn-danger btn-sm" onclick="return confirm('Delete user {{ user.username }}?')">
-                                                <i class="fas fa-trash"></i>
-                                            </button>
-                                        </form>
-                                    </td>
-                                </tr>
-                            {% endfor %}
-                        </tbody>
-                    </table>
-                {% else %}
-                    <div class="empty-state">
-                        <i class="fas fa-users"></i>
-                        <p>No Samba users configured</p>
-                    </div>
-                {% endif %}
+                {% include 'users_table.html' %}
             </div>
         </div>
 
@@ -803,72 +957,52 @@ HTML_TEMPLATE = """
                 </button>
             </div>
             
-            {% if mounts %}
-                <table class="table">
-                    <thead>
-                        <tr>
-                            <th>Remote Path</th>
-                            <th>Mount Point</th>
-                            <th>Type</th>
-                            <th>Status</th>
-                            <th>Actions</th>
-                        </tr>
-                    </thead>
-                    <tbody>
-                        {% for mount in mounts %}
-                            <tr>
-                                <td><code>{{ mount.remote }}</code></td>
-                                <td><code>{{ mount.mountpoint }}</code></td>
-                                <td><span class="badge info">{{ mount.fstype }}</span></td>
-                                <td>
-                                    {% if mount.is_mounted %}
-                                        <span class="status-indicator status-mounted">
-                                            <i class="fas fa-check-circle"></i> Mounted
-                                        </span>
-                                    {% else %}
-                                        <span class="status-indicator status-unmounted">
-                                            <i class="fas fa-circle"></i> Not Mounted
-                                        </span>
-                                    {% endif %}
-                                </td>
-                                <td>
-                                    {% if mount.is_mounted %}
-                                        <form method="post" style="display:inline;">
-                                            <input type="hidden" name="action" value="umount">
-                                            <input type="hidden" name="mountpoint" value="{{ mount.mountpoint }}">
-                                            <button type="submit" class="btn btn-warning btn-sm">
-                                                <i class="fas fa-eject"></i> Unmount
-                                            </button>
-                                        </form>
-                                    {% else %}
-                                        <form method="post" style="display:inline;">
-                                            <input type="hidden" name="action" value="mount">
-                                            <input type="hidden" name="mountpoint" value="{{ mount.mountpoint }}">
-                                            <button type="submit" class="btn btn-success btn-sm">
-                                                <i class="fas fa-plug"></i> Mount
-                                            </button>
-                                        </form>
-                                    {% endif %}
-                                    <form method="post" style="display:inline;">
-                                        <input type="hidden" name="action" value="delete_mount">
-                                        <input type="hidden" name="mountpoint" value="{{ mount.mountpoint }}">
-                                        <button type="submit" class="btn btn-danger btn-sm" onclick="return confirm('Remove mount {{ mount.mountpoint }} from fstab?')">
-                                            <i class="fas fa-trash"></i>
-                                        </button>
-                                    </form>
-                                </td>
-                            </tr>
-                        {% endfor %}
-                    </tbody>
-                </table>
-            {% else %}
-                <div class="empty-state">
-                    <i class="fas fa-plug"></i>
-                    <p>No CIFS/SMB mounts configured</p>
-                </div>
-            {% endif %}
+            {% include 'mounts_table.html' %}
+        </div>
+
+        {{ smb_selector_html }}
+
+        {{ system_actions_html }}
+
+        <!-- Footer -->
+        <div class="footer">
+            <p>Samba Control Center v{{ version }} | Built with Flask & Modern Design</p>
+            <p>Running on {{ system_info.hostname }} | {{ system_info.current_time }}</p>
+        </div>
+    </div>
+
+    {{ form_modals_html }}
+
+    <!-- Modal: Config View -->
+    <div id="configModal" class="modal">
+        <div class="modal-content" style="max-width: 900px;">
+            <span class="close-modal" onclick="closeModal('configModal')">&times;</span>
+            <h2 style="margin-bottom: 1.5rem;"><i class="fas fa-file-code"></i> Configuration File</h2>
+            <pre id="configContent">Loading...</pre>
         </div>
+    </div>
+
+{% endblock %}
+"""
+
+# Protocol cards shown in the SMB version selector
+SMB_VERSIONS = (
+    {'key': 'smb1', 'label': 'SMB 1.0', 'selected_label': 'SMB 1.0 (Legacy)', 'emoji': '🗄️', 'color_var': '--danger', 'tint': 'rgba(239, 68, 68, 0.1)',
+     'badge_class': 'warning', 'badge': 'Legacy / Not Secure', 'vers': 'vers=1.0', 'recommended': False,
+     'desc': Markup('Old protocol for very old systems (Windows XP, old NAS). <strong>Not recommended</strong> due to security vulnerabilities.')},
+    {'key': 'smb2', 'label': 'SMB 2.0 / 2.1', 'selected_label': 'SMB 2.1 (Recommended)', 'emoji': '📁', 'color_var': '--accent', 'tint': 'rgba(245, 158, 11, 0.1)',
+     'badge_class': 'success', 'badge': '⭐ Recommended', 'vers': 'vers=2.1', 'recommended': True,
+     'desc': Markup('Most compatible protocol. Works with Windows 7+, modern Linux/Samba servers. <strong>Best balance</strong> of compatibility and security.')},
+    {'key': 'smb3', 'label': 'SMB 3.0 / 3.1', 'selected_label': 'SMB 3.0 (Modern)', 'emoji': '🔒', 'color_var': '--success', 'tint': 'rgba(16, 185, 129, 0.1)',
+     'badge_class': 'info', 'badge': 'Modern / Encrypted', 'vers': 'vers=3.0', 'recommended': False,
+     'desc': Markup('Latest protocol with encryption. For Windows 8+, modern Samba 4.0+. <strong>Most secure</strong> but may not work with older systems.')},
+)
 
+# Preselected until the browser remembers another choice in the smb_version cookie
+DEFAULT_SMB_VERSION = next(v['key'] for v in SMB_VERSIONS if v['recommended'])
+
+# Dashboard sections with no per-request data, pre-rendered once at startup
+SMB_SELECTOR_TEMPLATE = """
         <!-- SMB Protocol Quick Selector -->
         <div class="card" style="background: linear-gradient(135deg, rgba(245, 158, 11, 0.1), rgba(15, 107, 84, 0.1)); border: 2px solid var(--accent);">
             <div class="card-header">
@@ -883,50 +1017,21 @@ HTML_TEMPLATE = """
                 </p>
                 
                 <div class="grid grid-3">
-                    <!-- SMB 1.0 -->
-                    <div class="card" style="background: var(--bg-dark); border: 2px solid var(--border); cursor: pointer; transition: all 0.3s;" onclick="selectSMBVersion('smb1')">
-                        <div style="text-align: center; padding: 1.5rem;">
-                            <div style="font-size: 3rem; margin-bottom: 1rem;">🗄️</div>
-                            <h3 style="color: var(--danger); margin-bottom: 0.5rem; font-size: 1.3rem;">SMB 1.0</h3>
-                            <span class="badge warning" style="margin-bottom: 1rem;">Legacy / Not Secure</span>
-                            <p style="color: var(--text-muted); font-size: 0.9rem; margin-top: 1rem;">
-                                Old protocol for very old systems (Windows XP, old NAS). <strong>Not recommended</strong> due to security vulnerabilities.
-                            </p>
-                            <div style="margin-top: 1rem; padding: 0.5rem; background: rgba(239, 68, 68, 0.1); border-radius: 6px;">
-                                <code style="color: var(--danger); font-size: 0.85rem;">vers=1.0</code>
-                            </div>
-                        </div>
-                    </div>
-                    
-                    <!-- SMB 2.0/2.1 -->
-                    <div class="card" style="background: var(--bg-dark); border: 2px solid var(--accent); cursor: pointer; transition: all 0.3s; box-shadow: 0 0 20px rgba(245, 158, 11, 0.3);" onclick="selectSMBVersion('smb2')">
-                        <div style="text-align: center; padding: 1.5rem;">
-                            <div style="font-size: 3rem; margin-bottom: 1rem;">📁</div>
-                            <h3 style="color: var(--accent); margin-bottom: 0.5rem; font-size: 1.3rem;">SMB 2.0 / 2.1</h3>
-                            <span class="badge success" style="margin-bottom: 1rem;">⭐ Recommended</span>
-                            <p style="color: var(--text-muted); font-size: 0.9rem; margin-top: 1rem;">
-                                Most compatible protocol. Works with Windows 7+, modern Linux/Samba servers. <strong>Best balance</strong> of compatibility and security.
-                            </p>
-                            <div style="margin-top: 1rem; padding: 0.5rem; background: rgba(245, 158, 11, 0.1); border-radius: 6px;">
-                                <code style="color: var(--accent); font-size: 0.85rem;">vers=2.1</code>
-                            </div>
-                        </div>
-                    </div>
-                    
-                    <!-- SMB 3.0+ -->
-                    <div class="card" style="background: var(--bg-dark); border: 2px solid var(--border); cursor: pointer; transition: all 0.3s;" onclick="selectSMBVersion('smb3')">
+                    {% for v in smb_versions %}
+                    <div class="card" style="background: var(--bg-dark); border: 2px solid var({{ '--accent' if v.key == selected_version else '--border' }}); cursor: pointer; transition: all 0.3s;{% if v.key == selected_version %} box-shadow: 0 0 20px rgba(245, 158, 11, 0.3);{% endif %}" data-selected-label="{{ v.selected_label }}" onclick="selectSMBVersion('{{ v.key }}')">
                         <div style="text-align: center; padding: 1.5rem;">
-                            <div style="font-size: 3rem; margin-bottom: 1rem;">🔒</div>
-                            <h3 style="color: var(--success); margin-bottom: 0.5rem; font-size: 1.3rem;">SMB 3.0 / 3.1</h3>
-                            <span class="badge info" style="margin-bottom: 1rem;">Modern / Encrypted</span>
+                            <div style="font-size: 3rem; margin-bottom: 1rem;">{{ v.emoji }}</div>
+                            <h3 style="color: var({{ v.color_var }}); margin-bottom: 0.5rem; font-size: 1.3rem;">{{ v.label }}</h3>
+                            <span class="badge {{ v.badge_class }}" style="margin-bottom: 1rem;">{{ v.badge }}</span>
                             <p style="color: var(--text-muted); font-size: 0.9rem; margin-top: 1rem;">
-                                Latest protocol with encryption. For Windows 8+, modern Samba 4.0+. <strong>Most secure</strong> but may not work with older systems.
+                                {{ v.desc }}
                             </p>
-                            <div style="margin-top: 1rem; padding: 0.5rem; background: rgba(16, 185, 129, 0.1); border-radius: 6px;">
-                                <code style="color: var(--success); font-size: 0.85rem;">vers=3.0</code>
+                            <div style="margin-top: 1rem; padding: 0.5rem; background: {{ v.tint }}; border-radius: 6px;">
+                                <code style="color: var({{ v.color_var }}); font-size: 0.85rem;">{{ v.vers }}</code>
                             </div>
                         </div>
                     </div>
+                    {% endfor %}
                 </div>
                 
                 <div style="margin-top: 1.5rem; padding: 1rem; background: var(--bg-medium); border-radius: 10px; border-left: 4px solid var(--info);">
@@ -934,7 +1039,9 @@ HTML_TEMPLATE = """
                         <i class="fas fa-info-circle" style="font-size: 1.5rem; color: var(--info);"></i>
                         <div>
                             <strong style="color: var(--text-primary);">Current Selection:</strong>
-                            <span id="currentSMBVersion" style="color: var(--accent); font-weight: 600; margin-left: 0.5rem;">SMB 2.1 (Auto-selected)</span>
+                            {% for v in smb_versions if v.key == selected_version %}
+                            <span id="currentSMBVersion" data-version="{{ v.key }}" style="color: var(--accent); font-weight: 600; margin-left: 0.5rem;">{{ v.selected_label }}</span>
+                            {% endfor %}
                             <p style="color: var(--text-muted); margin-top: 0.5rem; font-size: 0.9rem;">
                                 This version will be used when you click "Add Mount". You can also change it in the mount form.
                             </p>
@@ -943,7 +1050,9 @@ HTML_TEMPLATE = """
                 </div>
             </div>
         </div>
+"""
 
+SYSTEM_ACTIONS_TEMPLATE = """
         <!-- System Actions -->
         <div class="card">
             <div class="card-header">
@@ -955,7 +1064,7 @@ HTML_TEMPLATE = """
             <div class="action-bar">
                 <form method="post" style="display:inline;">
                     <input type="hidden" name="action" value="apply_mounts">
-                    <button type="submit" class="btn btn-success btn-lg" title="Mount all entries from /etc/fstab (runs: mount -a)">
+                    <button type="submit" class="btn btn-success btn-lg" title="Mount all CIFS/SMB entries from /etc/fstab (runs: mount -a -F -t cifs,smb,smb2,smb3,smbfs)">
                         <i class="fas fa-bolt"></i> Apply All Mounts
                     </button>
                 </form>
@@ -982,14 +1091,9 @@ HTML_TEMPLATE = """
                 </button>
             </div>
         </div>
+"""
 
-        <!-- Footer -->
-        <div class="footer">
-            <p>Samba Control Center v2.0 | Built with Flask & Modern Design</p>
-            <p>Running on {{ system_info.hostname }} | {{ system_info.current_time }}</p>
-        </div>
-    </div>
-
+FORM_MODALS_TEMPLATE = """
     <!-- Modal: Add Share -->
     <div id="addShareModal" class="modal">
         <div class="modal-content">
@@ -1123,317 +1227,706 @@ HTML_TEMPLATE = """
             </form>
         </div>
     </div>
+"""
 
-    <!-- Modal: Config View -->
-    <div id="configModal" class="modal">
-        <div class="modal-content" style="max-width: 900px;">
-            <span class="close-modal" onclick="closeModal('configModal')">&times;</span>
-            <h2 style="margin-bottom: 1.5rem;"><i class="fas fa-file-code"></i> Configuration File</h2>
-            <pre>{{ config_content }}</pre>
-        </div>
-    </div>
+# Share, user and mount tables - the data-driven parts of the dashboard
+SHARES_TABLE_TEMPLATE = """
+                {% if shares %}
+                    <table class="table">
+                        <thead>
+                            <tr>
+                                <th>Share Name</th>
+                                <th>Path</th>
+                                <th>Access</th>
+                                <th>Actions</th>
+                            </tr>
+                        </thead>
+                        <tbody>
+                            {{ share_rows }}
+                        </tbody>
+                    </table>
+                {% else %}
+                    <div class="empty-state">
+                        <i class="fas fa-folder-open"></i>
+                        <p>No shares configured</p>
+                    </div>
+                {% endif %}
+"""
 
-    <script>
-        function showModal(id) {
-            document.getElementById(id).classList.add('active');
-            
-            // When opening Add Mount modal, pre-select the SMB version
-            if (id === 'addMountModal' && window.selectedSMBVersion) {
-                const smbVersionMap = {
-                    'smb1': 'smbfs',
-                    'smb2': 'smb',
-                    'smb3': 'smb3'
-                };
-                const fstype = smbVersionMap[window.selectedSMBVersion] || 'cifs';
-                const select = document.querySelector('#addMountModal select[name="fstype"]');
-                if (select) {
-                    select.value = fstype;
-                }
-            }
-        }
-        
-        function closeModal(id) {
-            document.getElementById(id).classList.remove('active');
-        }
-        
-        function selectSMBVersion(version) {
-            window.selectedSMBVersion = version;
-            
-            // Update visual selection
-            const cards = document.querySelectorAll('.card[onclick^="selectSMBVersion"]');
-            cards.forEach(card => {
-                card.style.border = '2px solid var(--border)';
-                card.style.boxShadow = 'none';
-            });
-            
-            const selectedCard = document.querySelector(`[onclick="selectSMBVersion('${version}')"]`);
-            if (selectedCard) {
-                selectedCard.style.border = '2px solid var(--accent)';
-                selectedCard.style.boxShadow = '0 0 20px rgba(245, 158, 11, 0.3)';
-            }
-            
-            // Update text
-            const versionNames = {
-                'smb1': 'SMB 1.0 (Legacy)',
-                'smb2': 'SMB 2.1 (Recommended)',
-                'smb3': 'SMB 3.0 (Modern)'
-            };
-            
-            const currentVersionSpan = document.getElementById('currentSMBVersion');
-            if (currentVersionSpan) {
-                currentVersionSpan.textContent = versionNames[version] || 'SMB 2.1';
-            }
-            
-            // Show notification
-            const notification = document.createElement('div');
-            notification.className = 'alert alert-success';
-            notification.innerHTML = `
-                <i class="fas fa-check-circle"></i>
-                <span>${versionNames[version]} selected! This will be used for new mounts.</span>
-            `;
-            notification.style.position = 'fixed';
-            notification.style.top = '20px';
-            notification.style.right = '20px';
-            notification.style.zIndex = '10000';
-            notification.style.animation = 'slideIn 0.3s ease-out';
-            document.body.appendChild(notification);
-            
-            setTimeout(() => {
-                notification.style.opacity = '0';
-                notification.style.transition = 'opacity 0.5s';
-                setTimeout(() => notification.remove(), 500);
-            }, 2000);
-        }
-        
-        // Set default to SMB2 on page load
-        window.addEventListener('DOMContentLoaded', function() {
-            selectSMBVersion('smb2');
-        });
-        
-        function setMountOption(option) {
-            const input = document.getElementById('mountOptions');
-            const current = input.value.trim();
-            if (current) {
-                // Add to existing options
-                input.value = current + ',' + option;
-            } else {
-                // Set as first option
-                input.value = option;
-            }
-        }
-        
-        // Close modal when clicking outside
-        window.onclick = function(event) {
-            if (event.target.classList.contains('modal')) {
-                event.target.classList.remove('active');
-            }
-        }
-        
-        // Auto-dismiss alerts after 5 seconds
-        setTimeout(function() {
-            const alerts = document.querySelectorAll('.alert');
-            alerts.forEach(alert => {
-                alert.style.transition = 'opacity 0.5s';
-                alert.style.opacity = '0';
-                setTimeout(() => alert.remove(), 500);
-            });
-        }, 5000);
-    </script>
-</body>
-</html>
+USERS_TABLE_TEMPLATE = """
+                {% if users %}
+                    <table class="table">
+                        <thead>
+                            <tr>
+                                <th>Username</th>
+                                <th>Status</th>
+                                <th>Actions</th>
+                            </tr>
+                        </thead>
+                        <tbody>
+                            {{ user_rows }}
+                        </tbody>
+                    </table>
+                {% else %}
+                    <div class="empty-state">
+                        <i class="fas fa-users"></i>
+                        <p>No Samba users configured</p>
+                    </div>
+                {% endif %}
+"""
+
+MOUNTS_TABLE_TEMPLATE = """
+            {% if mounts %}
+                <table class="table">
+                    <thead>
+                        <tr>
+                            <th>Remote Path</th>
+                            <th>Mount Point</th>
+                            <th>Type</th>
+                            <th>Status</th>
+                            <th>Actions</th>
+                        </tr>
+                    </thead>
+                    <tbody>
+                        {{ mount_rows }}
+                    </tbody>
+                </table>
+            {% else %}
+                <div class="empty-state">
+                    <i class="fas fa-plug"></i>
+                    <p>No CIFS/SMB mounts configured</p>
+                </div>
+            {% endif %}
 """
 
+# Registered under a name so Flask's template cache keeps the compiled template between
+# requests (render_template_string would re-parse the source every time)
+app.jinja_loader = DictLoader({
+    'base.html': BASE_TEMPLATE,
+    'index.html': HTML_TEMPLATE,
+    'shares_table.html': SHARES_TABLE_TEMPLATE,
+    'users_table.html': USERS_TABLE_TEMPLATE,
+    'mounts_table.html': MOUNTS_TABLE_TEMPLATE,
+    'smb_selector.html': SMB_SELECTOR_TEMPLATE,
+    'system_actions.html': SYSTEM_ACTIONS_TEMPLATE,
+    'form_modals.html': FORM_MODALS_TEMPLATE
+})
+
+# Compiled template bytecode survives restarts, so new processes skip the parse
+if os.path.isdir(JINJA_CACHE_DIR):
+    app.jinja_env.bytecode_cache = FileSystemBytecodeCache(JINJA_CACHE_DIR)
+
+def _private_dir(path: str):
+    """Create path as a 0700 directory owned by us, or verify an existing one is
+    
+    Refuses symlinks and directories owned by another user, since code gets
+    imported from here by a process running as root.
+    """
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    st = os.lstat(path)
+    if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.geteuid():
+        raise PermissionError(f"{path} is not a directory owned by uid {os.geteuid()}")
+    if stat.S_IMODE(st.st_mode) & 0o077:
+        os.chmod(path, 0o700)
+
+def use_compiled_templates(cache_dir: str = JINJA_CACHE_DIR) -> bool:
+    """Load templates from ahead-of-time compiled Python modules instead of Jinja source"""
+    # One module directory per template revision, so an upgraded script never runs stale code
+    # (whitespace options change the generated code too)
+    sources = app.jinja_loader.mapping
+    env = app.jinja_env
+    digest = hashlib.sha256(repr((sorted(sources.items()), env.trim_blocks, env.lstrip_blocks)).encode()).hexdigest()[:16]
+    modules_dir = os.path.join(cache_dir, 'modules')
+    target = os.path.join(modules_dir, digest)
+    
+    try:
+        _private_dir(cache_dir)
+        _private_dir(modules_dir)
+        if not os.path.isdir(target):
+            # Compile next to the target and rename, so concurrent workers never see a partial set
+            tmp_dir = f"{target}.tmp{os.getpid()}"
+            try:
+                os.mkdir(tmp_dir, 0o700)
+                app.jinja_env.compile_templates(tmp_dir, zip=None, ignore_errors=False)
+                os.rename(tmp_dir, target)
+            except OSError:
+                # Another worker won the rename; its set is just as good
+                if not os.path.isdir(target):
+                    raise
+            finally:
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+        _private_dir(target)
+        
+        app.jinja_env.loader = ModuleLoader(target)
+        return True
+    except Exception as e:
+        logger.warning("Could not use compiled templates: %s", e)
+        return False
+
+# Production runs import the compiled modules (and Python's .pyc cache) instead of
+# parsing and compiling template source; debug keeps the reloading source loader
+if not app.config['DEBUG'] and os.path.isdir(JINJA_CACHE_DIR):
+    use_compiled_templates()
+
+# Web font and icon stylesheets; point these at a local copy to self-host them
+FONT_CSS_URL = os.environ.get('SCC_FONT_CSS', 'https://fonts.googleapis.com/css2?family=IBM+Plex+Sans:wght@400;500;600;700&family=JetBrains+Mono:wght@400;600&display=swap')
+ICON_CSS_URL = os.environ.get('SCC_ICON_CSS', 'https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.5.0/css/all.min.css')
+
+# Static assets served from memory: name -> (body, mimetype, etag, gzipped body).
+# They never change at runtime, so they are compressed once here instead of per response.
+STATIC_ASSETS = {
+    name: (body, mimetype, hashlib.sha256(body).hexdigest()[:16], gzip.compress(body, 9, mtime=0))
+    for name, body, mimetype in [
+        ('app.css', STYLESHEET.encode(), 'text/css'),
+        ('grain.svg', GRAIN_SVG.encode(), 'image/svg+xml')
+    ]
+}
+
+# Content-addressed names (app.<hash>.css) -> asset name; these URLs never change meaning
+ASSET_FINGERPRINTS = {
+    '{0}.{2}{1}'.format(*os.path.splitext(name), etag): name
+    for name, (_, _, etag, _) in STATIC_ASSETS.items()
+}
+ASSET_URLS = {name: f'/assets/{fingerprinted}' for fingerprinted, name in ASSET_FINGERPRINTS.items()}
+
+@app.template_global()
+def asset_url(name: str) -> str:
+    """Fingerprinted URL of an embedded static asset"""
+    return ASSET_URLS[name]
+
+# Template values that never change between requests
+_STATIC_CTX = MappingProxyType({
+    'version': VERSION,
+    'font_css': FONT_CSS_URL,
+    'icon_css': ICON_CSS_URL,
+    'critical_css': Markup(CRITICAL_CSS.replace('/assets/grain.svg', ASSET_URLS['grain.svg'])),
+    **{
+        name.replace('.', '_'): Markup(app.jinja_env.get_template(name).render(smb_versions=SMB_VERSIONS))
+        for name in ('system_actions.html', 'form_modals.html')
+    }
+})
+
+# One pre-rendered SMB selector per possible selection
+SMB_SELECTOR_HTML = MappingProxyType({
+    v['key']: Markup(app.jinja_env.get_template('smb_selector.html').render(
+        smb_versions=SMB_VERSIONS, selected_version=v['key']))
+    for v in SMB_VERSIONS
+})
+
+# =============================================================================
+# Table Rows
+# =============================================================================
+
+# The row loops are the only part of the page that grows with the data, so they are
+# built with f-strings instead of Jinja; every data field goes through escape().
+# Each row's fields are unpacked with a single attrgetter call rather than one lookup per use.
+_SHARE_ROW_FIELDS = operator.attrgetter('name', 'path', 'writable')
+_USER_ROW_FIELDS = operator.attrgetter('username', 'is_enabled')
+_MOUNT_ROW_FIELDS = operator.attrgetter('remote', 'mountpoint', 'fstype', 'is_mounted',
+                                        'credentials_file', 'credentials_file_exists')
+
+# Status badges keyed by the flag they display
+BADGE_RW = {
+    True: Markup('<span class="badge success">RW</span>'),
+    False: Markup('<span class="badge info">RO</span>')
+}
+BADGE_USER_STATUS = {
+    True: Markup('<span class="badge success">Enabled</span>'),
+    False: Markup('<span class="badge warning">Disabled</span>')
+}
+STATUS_MOUNT = {
+    True: Markup('<span class="status-indicator status-mounted"><i class="fas fa-check-circle"></i> Mounted</span>'),
+    False: Markup('<span class="status-indicator status-unmounted"><i class="fas fa-circle"></i> Not Mounted</span>')
+}
+
+def action_form(action: str, field: str, value: str, btn_class: str, icon: str,
+                label: str = '', confirm: str = '') -> str:
+    """Inline POST form with one hidden field and a submit button; value and confirm come pre-escaped"""
+    onclick = f" onclick=\"return confirm('{confirm}')\"" if confirm else ''
+    text = f' {label}' if label else ''
+    return (f'<form method="post" style="display:inline;">'
+            f'<input type="hidden" name="action" value="{action}">'
+            f'<input type="hidden" name="{field}" value="{value}">'
+            f'<button type="submit" class="btn {btn_class} btn-sm"{onclick}><i class="fas {icon}"></i>{text}</button>'
+            f'</form>')
+
+def render_share_rows(shares: List[SambaShare]) -> Markup:
+    """<tr> rows for the shares table"""
+    rows = []
+    for name, path, writable in map(_SHARE_ROW_FIELDS, shares):
+        name = escape(name)
+        delete = action_form('delete_share', 'share_name', name, 'btn-danger', 'fa-trash',
+                             confirm=f'Delete share [{name}]?')
+        rows.append(f"""
+                                <tr>
+                                    <td><strong>{name}</strong></td>
+                                    <td><code>{escape(path)}</code></td>
+                                    <td>{BADGE_RW[writable]}</td>
+                                    <td>{delete}</td>
+                                </tr>""")
+    return Markup(''.join(rows))
+
+def render_user_rows(users: List[SambaUser]) -> Markup:
+    """<tr> rows for the users table"""
+    rows = []
+    for username, is_enabled in map(_USER_ROW_FIELDS, users):
+        username = escape(username)
+        delete = action_form('delete_user', 'username', username, 'btn-danger', 'fa-trash',
+                             confirm=f'Delete user {username}?')
+        rows.append(f"""
+                                <tr>
+                                    <td><strong>{username}</strong></td>
+                                    <td>{BADGE_USER_STATUS[is_enabled]}</td>
+                                    <td>{delete}</td>
+                                </tr>""")
+    return Markup(''.join(rows))
+
+def render_mount_rows(mounts: List[CifsMount]) -> Markup:
+    """<tr> rows for the mounts table"""
+    rows = []
+    for remote, mountpoint, fstype, is_mounted, creds, creds_exist in map(_MOUNT_ROW_FIELDS, mounts):
+        mountpoint = escape(mountpoint)
+        if is_mounted:
+            toggle = action_form('umount', 'mountpoint', mountpoint, 'btn-warning', 'fa-eject', 'Unmount')
+        else:
+            toggle = action_form('mount', 'mountpoint', mountpoint, 'btn-success', 'fa-plug', 'Mount')
+        missing_creds = ''
+        if creds and not creds_exist:
+            missing_creds = (f'\n                                    <span class="badge warning" title="{escape(creds)}">'
+                             '<i class="fas fa-key"></i> Missing credentials</span>')
+        delete = action_form('delete_mount', 'mountpoint', mountpoint, 'btn-danger', 'fa-trash',
+                             confirm=f'Remove mount {mountpoint} from fstab?')
+        rows.append(f"""
+                            <tr>
+                                <td><code>{escape(remote)}</code></td>
+                                <td><code>{mountpoint}</code></td>
+                                <td><span class="badge info">{escape(fstype)}</span></td>
+                                <td>
+                                    {STATUS_MOUNT[is_mounted]}{missing_creds}
+                                </td>
+                                <td>
+                                    {toggle}
+                                    {delete}
+                                </td>
+                            </tr>""")
+    return Markup(''.join(rows))
+
+# =============================================================================
+# Caching
+# =============================================================================
+
+# Output of subprocess-backed probes: (function qualname, args) -> (monotonic timestamp, result)
+_CMD_CACHE: Dict[tuple, Tuple[float, object]] = {}
+# Guards _CMD_CACHE: the probe pool and the server threads fill it concurrently
+_CMD_CACHE_LOCK = threading.Lock()
+
+def ttl_cache(seconds: float = 2):
+    """Memoize a function's result for a short time so rapid page refreshes reuse it"""
+    def decorator(fn):
+        name = fn.__qualname__
+        
+        @functools.wraps(fn)
+        def wrapper(*args):
+            key = (name, args)
+            cached = _CMD_CACHE.get(key)
+            now = time.monotonic()
+            if cached and now - cached[0] < seconds:
+                return cached[1]
+            result = fn(*args)
+            with _CMD_CACHE_LOCK:
+                _CMD_CACHE[key] = (now, result)
+            return result
+        
+        def cache_clear():
+            """Forget this function's memoized results"""
+            with _CMD_CACHE_LOCK:
+                for key in [key for key in _CMD_CACHE if key[0] == name]:
+                    del _CMD_CACHE[key]
+        
+        wrapper.cache_clear = cache_clear
+        return wrapper
+    return decorator
+
+def invalidate_cmd_cache():
+    """Drop all memoized probe results after a state-changing action"""
+    with _CMD_CACHE_LOCK:
+        _CMD_CACHE.clear()
+
 # =============================================================================
 # Core Functions - Configuration Management
 # =============================================================================
 
+@contextlib.contextmanager
+def atomic_writer(path: str, errors: str = 'strict') -> Iterator[io.TextIOBase]:
+    """Open a temp file next to path that replaces it via os.replace() on success
+    
+    Readers see either the old or the new file, never a truncated one, and the
+    original file mode is kept. The data is fdatasync()ed before the rename so
+    a crash cannot leave an empty file behind; on error path is left alone.
+    errors='surrogateescape' writes back bytes read with the same handler.
+    """
+    tmp = tempfile.NamedTemporaryFile('w', encoding='utf-8', errors=errors, dir=os.path.dirname(path),
+                                      prefix=f".{os.path.basename(path)}.", delete=False)
+    try:
+        with tmp:
+            yield tmp
+            tmp.flush()
+            os.fdatasync(tmp.fileno())
+        try:
+            os.chmod(tmp.name, stat.S_IMODE(os.stat(path).st_mode))
+        except FileNotFoundError:
+            os.chmod(tmp.name, 0o644)
+        os.replace(tmp.name, path)
+    except BaseException:
+        os.unlink(tmp.name)
+        raise
+
+def atomic_write(path: str, data: str, errors: str = 'strict'):
+    """Replace path with data in one write, see atomic_writer()"""
+    with atomic_writer(path, errors) as f:
+        f.write(data)
+
+def read_text(path: str, errors: str = 'replace') -> str:
+    """Read a config file as text; pure-ASCII files (the usual case) skip the UTF-8 decoder"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    return data.decode('ascii') if data.isascii() else data.decode('utf-8', errors=errors)
+
+# Parsed smb.conf keyed by (path, st_mtime_ns, st_size) - reparsed only on change
+_SMB_CACHE: Optional[Tuple[str, int, int, Dict[str, Dict[str, str]]]] = None
+
+# Shares built from the last parse returned by load_smb_conf(): (sections dict, shares)
+_SHARES_CACHE: Optional[Tuple[Dict[str, Dict[str, str]], list]] = None
+
+def load_smb_conf(config_path: str = SMB_CONF) -> Dict[str, Dict[str, str]]:
+    """Return smb.conf as {section: {option: value}}, cached until the file changes
+    
+    The returned dict is shared between callers and must not be modified.
+    """
+    global _SMB_CACHE
+    
+    st = os.stat(config_path)
+    if _SMB_CACHE and _SMB_CACHE[:3] == (config_path, st.st_mtime_ns, st.st_size):
+        return _SMB_CACHE[3]
+    
+    data = scan_smb_conf(read_text(config_path))
+    _SMB_CACHE = (config_path, st.st_mtime_ns, st.st_size, data)
+    return data
+
+def scan_smb_conf(text: str) -> Dict[str, Dict[str, str]]:
+    """Single-pass smb.conf reader with configparser's semantics (allow_no_value, strict=False)
+    
+    Full-line '#'/';' comments, case-insensitive option names, repeated sections merged,
+    options without '=' mapped to None and deeper-indented lines continuing the previous value.
+    Lines before the first section header are ignored.
+    """
+    data: Dict[str, Dict[str, str]] = {}
+    section = None
+    option = None
+    option_indent = 0
+    
+    for raw in text.splitlines():
+        line = raw.strip()
+        if not line or line[0] in '#;':
+            continue
+        
+        indent = len(raw) - len(raw.lstrip())
+        if option is not None and indent > option_indent and section[option] is not None:
+            section[option] += '\n' + line
+            continue
+        
+        if line[0] == '[' and ']' in line:
+            section = data.setdefault(line[1:line.rindex(']')], {})
+            option = None
+            continue
+        if section is None:
+            continue
+        
+        key, sep, value = line.partition('=')
+        option = key.strip().lower()
+        option_indent = indent
+        section[option] = value.strip() if sep else None
+    
+    return data
+
+def _format_section(name: str, options: Dict[str, str]) -> str:
+    """smb.conf text for one section, in the file's indented 'key = value' style"""
+    return ''.join([f"[{name}]\n"] + [f"   {key} = {value}\n" for key, value in options.items()])
+
 class SambaConfig:
     """Handles Samba configuration file operations"""
     
+    # Every spelling Samba accepts for a boolean parameter
+    BOOL_MAP = {'yes': True, 'true': True, 'on': True, '1': True,
+                'no': False, 'false': False, 'off': False, '0': False}
+    
     def __init__(self, config_path: str = SMB_CONF):
         self.config_path = config_path
-        self.parser = None
         self.error = None
     
-    def load(self) -> bool:
-        """Load the Samba configuration file"""
-        try:
-            self.parser = configparser.ConfigParser(
-                allow_no_value=True,
-                delimiters=('=',),
-                strict=False,
-                interpolation=None
-            )
-            
-            if os.path.isfile(self.config_path):
-                with open(self.config_path, 'r', encoding='utf-8', errors='replace') as f:
-                    self.parser.read_file(f)
-                return True
-            else:
-                self.error = f"Config file not found: {self.config_path}"
-                return False
-        except Exception as e:
-            self.error = f"Failed to load config: {str(e)}"
-            return False
-    
-    def save(self) -> bool:
-        """Save the configuration back to file"""
-        try:
-            # Create backup first
-            self.create_backup()
-            
-            with open(self.config_path, 'w', encoding='utf-8') as f:
-                self.parser.write(f, space_around_delimiters=True)
-            return True
-        except Exception as e:
-            self.error = f"Failed to save config: {str(e)}"
-            return False
-    
-    def create_backup(self) -> str:
-        """Create a timestamped backup of the configuration"""
+    def create_backup(self, min_age: float = 0) -> str:
+        """Create a timestamped backup of the configuration
+        
+        With min_age, a backup younger than min_age seconds is reused instead.
+        """
         if not os.path.isfile(self.config_path):
             return None
         
+        if min_age:
+            latest = self.latest_backup()
+            if latest and time.time() - latest.stat().st_mtime < min_age:
+                return latest.path
+        
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         backup_path = os.path.join(BACKUP_DIR, f"smb.conf.{timestamp}.bak")
-        shutil.copy2(self.config_path, backup_path)
+        # copyfile() is a kernel sendfile() on Linux; unlike copy2() it leaves the backup's
+        # mtime at "now", which min_age relies on. Only the permission bits are mirrored.
+        shutil.copyfile(self.config_path, backup_path)
+        shutil.copymode(self.config_path, backup_path)
         return backup_path
     
+    @staticmethod
+    def latest_backup() -> Optional[os.DirEntry]:
+        """Most recently written smb.conf backup, if any"""
+        try:
+            with os.scandir(BACKUP_DIR) as it:
+                backups = [e for e in it if e.name.startswith('smb.conf.') and e.name.endswith('.bak')]
+        except OSError:
+            return None
+        return max(backups, key=lambda e: e.stat().st_mtime, default=None)
+    
     def get_shares(self) -> List[SambaShare]:
-        """Get all configured shares"""
-        if not self.parser:
-            self.load()
+        """Get all configured shares
+        
+        The list is rebuilt only when load_smb_conf() reparsed the file; it is
+        shared between callers and must not be modified.
+        """
+        global _SHARES_CACHE
+        
+        try:
+            sections = load_smb_conf(self.config_path)
+        except FileNotFoundError:
+            self.error = f"Config file not found: {self.config_path}"
+            return []
+        except Exception as e:
+            self.error = f"Failed to load config: {str(e)}"
+            return []
+        
+        if _SHARES_CACHE and _SHARES_CACHE[0] is sections:
+            return _SHARES_CACHE[1]
         
+        bool_map = self.BOOL_MAP
         shares = []
-        for section in self.parser.sections():
+        for section, options in sections.items():
             if section.lower() != 'global':
+                get = options.get
                 share = SambaShare(
-                    name=section,
-                    path=self.parser.get(section, 'path', fallback=''),
-                    comment=self.parser.get(section, 'comment', fallback=''),
-                    writable=self.parser.get(section, 'writable', fallback='yes').lower() == 'yes',
-                    browseable=self.parser.get(section, 'browseable', fallback='yes').lower() == 'yes',
-                    guest_ok=self.parser.get(section, 'guest ok', fallback='no').lower() == 'yes',
-                    valid_users=self.parser.get(section, 'valid users', fallback=''),
-                    create_mask=self.parser.get(section, 'create mask', fallback='0664'),
-                    directory_mask=self.parser.get(section, 'directory mask', fallback='0775')
+                    name=_html_inert(section),
+                    path=_html_inert(get('path') or ''),
+                    comment=get('comment') or '',
+                    writable=bool_map.get((get('writable') or '').lower(), True),
+                    browseable=bool_map.get((get('browseable') or '').lower(), True),
+                    guest_ok=bool_map.get((get('guest ok') or '').lower(), False),
+                    valid_users=get('valid users') or '',
+                    # Masks repeat across shares; intern so duplicates share one string
+                    create_mask=sys.intern(get('create mask') or '0664'),
+                    directory_mask=sys.intern(get('directory mask') or '0775')
                 )
                 shares.append(share)
+        
+        _SHARES_CACHE = (sections, shares)
         return shares
     
     def add_share(self, share: SambaShare) -> bool:
-        """Add a new share to the configuration"""
-        if not self.parser:
-            self.load()
-        
+        """Add a new share by appending its section; the rest of the file is left untouched"""
         try:
-            if self.parser.has_section(share.name):
+            try:
+                exists = share.name in load_smb_conf(self.config_path)
+            except FileNotFoundError:
+                exists = False
+            if exists:
                 self.error = f"Share '{share.name}' already exists"
                 return False
             
-            self.parser.add_section(share.name)
-            self.parser.set(share.name, 'path', share.path)
-            self.parser.set(share.name, 'writable', 'yes' if share.writable else 'no')
-            self.parser.set(share.name, 'browseable', 'yes' if share.browseable else 'no')
-            self.parser.set(share.name, 'guest ok', 'yes' if share.guest_ok else 'no')
-            
-            if share.comment:
-                self.parser.set(share.name, 'comment', share.comment)
-            if share.valid_users:
-                self.parser.set(share.name, 'valid users', share.valid_users)
-            
-            self.parser.set(share.name, 'create mask', share.create_mask)
-            self.parser.set(share.name, 'directory mask', share.directory_mask)
+            options = {
+                'path': share.path,
+                'writable': 'yes' if share.writable else 'no',
+                'browseable': 'yes' if share.browseable else 'no',
+                'guest ok': 'yes' if share.guest_ok else 'no',
+                **({'comment': share.comment} if share.comment else {}),
+                **({'valid users': share.valid_users} if share.valid_users else {}),
+                'create mask': share.create_mask,
+                'directory mask': share.directory_mask
+            }
+            block = _format_section(share.name, options)
+            # Read the block back: a newline or bracket smuggled into a value must not
+            # turn into extra options or sections
+            if scan_smb_conf(block) != {share.name: {key: value.strip() for key, value in options.items()}}:
+                self.error = "Share name and options must be single-line values"
+                return False
             
-            return self.save()
+            self.create_backup(min_age=60)
+            with open(self.config_path, 'a+b') as f:
+                # Keep one blank line between the previous section and the new one
+                separator = b''
+                if f.seek(0, os.SEEK_END):
+                    f.seek(-1, os.SEEK_END)
+                    separator = b'\n' if f.read(1) == b'\n' else b'\n\n'
+                f.write(separator + block.encode('utf-8'))
+            return True
         except Exception as e:
             self.error = f"Failed to add share: {str(e)}"
             return False
     
     def delete_share(self, share_name: str) -> bool:
-        """Remove a share from the configuration"""
-        if not self.parser:
-            self.load()
-        
+        """Remove a share by cutting its section(s) out of the file; comments elsewhere survive"""
         try:
-            if not self.parser.has_section(share_name):
+            lines = read_text(self.config_path).splitlines(keepends=True)
+            
+            kept = []
+            gap = []   # blank lines in front of the removed section, restored if another follows
+            tail = []  # comments ending the removed section; they introduce the next one
+            found = in_share = False
+            for line in lines:
+                stripped = line.strip()
+                if stripped[:1] == '[' and ']' in stripped:
+                    was_in_share = in_share
+                    in_share = stripped[1:stripped.rindex(']')] == share_name
+                    if in_share:
+                        found = True
+                        while kept and not kept[-1].strip():
+                            gap.append(kept.pop())
+                    else:
+                        if was_in_share:
+                            while tail and not tail[0].strip():
+                                tail.pop(0)
+                            kept.extend(gap + tail)
+                        else:
+                            kept.extend(gap)
+                        gap = []
+                if in_share:
+                    tail = tail + [line] if not stripped or stripped[0] in '#;' else []
+                else:
+                    kept.append(line)
+            
+            if not found:
                 self.error = f"Share '{share_name}' not found"
                 return False
             
-            self.parser.remove_section(share_name)
-            return self.save()
+            self.create_backup(min_age=60)
+            atomic_write(self.config_path, ''.join(kept))
+            return True
         except Exception as e:
             self.error = f"Failed to delete share: {str(e)}"
             return False
-    
-    def get_config_content(self) -> str:
-        """Get the raw configuration file content"""
-        try:
-            with open(self.config_path, 'r', encoding='utf-8', errors='replace') as f:
-                return f.read()
-        except Exception as e:
-            return f"Error reading config: {str(e)}"
 
 # =============================================================================
 # User Management
 # =============================================================================
 
+# One match per `pdbedit -L -v` record: username plus the Account Flags of the same record
+_PDBEDIT_VERBOSE_RE = re.compile(
+    r'^Unix username:[ \t]*(\S+)(?:\n(?!Unix username:).*)*?\nAccount Flags:[ \t]*\[?([^\]\n]*)',
+    re.M
+)
+# `pdbedit -L` lines: "username:uid:full name"
+_PDBEDIT_LIST_RE = re.compile(r'^[ \t]*([^:\n]*?)[ \t]*:', re.M)
+
+# acct_flags bit behind pdbedit's 'D' (disabled) flag
+_ACB_DISABLED = 0x0001
+
 class SambaUserManager:
     """Manages Samba users"""
     
+    # passdb handle from the samba bindings, opened on first use and shared by all requests
+    _pdb = None
+    _pdb_lock = threading.Lock()
+    
+    @staticmethod
+    def _passdb_users() -> Optional[List[SambaUser]]:
+        """Users read through the samba passdb bindings, or None when they can't be used"""
+        if samba_passdb is None:
+            return None
+        
+        try:
+            # The bindings are not thread-safe; the dashboard probes run on a pool
+            with SambaUserManager._pdb_lock:
+                if SambaUserManager._pdb is None:
+                    lp = samba_param.LoadParm()
+                    lp.load(SMB_CONF)
+                    samba_passdb.set_smb_config(SMB_CONF)
+                    samba_passdb.set_secrets_dir(lp.get('private dir'))
+                    SambaUserManager._pdb = samba_passdb.PDB(lp.get('passdb backend'))
+                entries = SambaUserManager._pdb.search_users(0)
+        except Exception as e:
+            logger.warning("samba passdb bindings failed, falling back to pdbedit: %s", e)
+            return None
+        
+        return [
+            SambaUser(username=_html_inert(entry['account_name']),
+                      is_enabled=not entry['acct_flags'] & _ACB_DISABLED)
+            for entry in entries
+        ]
+    
     @staticmethod
+    @ttl_cache(seconds=5)
     def get_users() -> List[SambaUser]:
         """Get list of all Samba users"""
+        users = SambaUserManager._passdb_users()
+        if users is not None:
+            return users
+        
         users = []
         try:
             result = subprocess.run(
                 ['pdbedit', '-L', '-v'],
                 capture_output=True,
                 text=True,
-                check=False
+                check=False,
+                timeout=CMD_TIMEOUT
             )
             
             if result.returncode == 0 and result.stdout:
-                current_user = None
-                for line in result.stdout.split('\n'):
-                    if line.startswith('Unix username:'):
-                        username = line.split(':', 1)[1].strip()
-                        current_user = SambaUser(username=username)
-                    elif line.startswith('Account Flags:') and current_user:
-                        flags = line.split(':', 1)[1].strip()
-                        current_user.is_enabled = 'D' not in flags
-                        users.append(current_user)
-                        current_user = None
+                users = [
+                    SambaUser(username=_html_inert(username), is_enabled='D' not in flags)
+                    for username, flags in _PDBEDIT_VERBOSE_RE.findall(result.stdout)
+                ]
             else:
                 # Fallback: Try simple list
                 result2 = subprocess.run(
                     ['pdbedit', '-L'],
                     capture_output=True,
                     text=True,
-                    check=False
+                    check=False,
+                    timeout=CMD_TIMEOUT
                 )
                 if result2.returncode == 0 and result2.stdout:
-                    for line in result2.stdout.strip().split('\n'):
-                        if ':' in line:
-                            username = line.split(':')[0].strip()
-                            if username:
-                                users.append(SambaUser(username=username, is_enabled=True))
+                    users = [
+                        SambaUser(username=_html_inert(username), is_enabled=True)
+                        for username in _PDBEDIT_LIST_RE.findall(result2.stdout) if username
+                    ]
         except FileNotFoundError:
-            print("Warning: pdbedit not found - Samba may not be installed")
+            logger.warning("pdbedit not found - Samba may not be installed")
+        except subprocess.TimeoutExpired:
+            logger.warning("pdbedit did not answer within %ss", CMD_TIMEOUT)
         except Exception as e:
-            print(f"Error getting Samba users: {e}")
+            logger.error("Error getting Samba users: %s", e)
         
         return users
     
     @staticmethod
     def add_user(username: str, password: str) -> Tuple[bool, str]:
         """Add a new Samba user"""
+        if not _valid_username(username):
+            return False, f"Invalid username: '{username}'"
+        
         try:
             # First, create Unix user if doesn't exist
             result = subprocess.run(
                 ['id', username],
                 capture_output=True,
-                check=False
+                check=False,
+                timeout=CMD_TIMEOUT
             )
             
             if result.returncode != 0:
@@ -1442,44 +1935,58 @@ class SambaUserManager:
                     ['useradd', '-M', '-s', '/usr/sbin/nologin', username],
                     capture_output=True,
                     text=True,
-                    check=False
+                    check=False,
+                    timeout=CMD_TIMEOUT
                 )
                 
                 if result.returncode != 0:
                     return False, f"Failed to create Unix user: {result.stderr}"
             
-            # Add to Samba
+            # Add to Samba; -s reads the new password (twice) from stdin, no shell involved
             result = subprocess.run(
-                ['bash', '-c', f'echo -e "{password}\\n{password}" | smbpasswd -a -s {username}'],
+                ['smbpasswd', '-a', '-s', username],
+                input=f"{password}\n{password}\n",
                 capture_output=True,
                 text=True,
-                check=False
+                check=False,
+                timeout=CMD_TIMEOUT
             )
             
             if result.returncode == 0:
+                SambaUserManager.get_users.cache_clear()
                 return True, f"User '{username}' added successfully"
             else:
                 return False, f"Failed to add Samba user: {result.stderr}"
         
+        except subprocess.TimeoutExpired as e:
+            return False, f"Timed out after {CMD_TIMEOUT}s running {e.cmd[0]}"
         except Exception as e:
             return False, f"Error adding user: {str(e)}"
     
     @staticmethod
     def delete_user(username: str) -> Tuple[bool, str]:
         """Delete a Samba user"""
+        # pdbedit also lists machine accounts, and the table offers to delete them
+        if not _valid_username(username, machine_account=True):
+            return False, f"Invalid username: '{username}'"
+        
         try:
             result = subprocess.run(
                 ['smbpasswd', '-x', username],
                 capture_output=True,
                 text=True,
-                check=False
+                check=False,
+                timeout=CMD_TIMEOUT
             )
             
             if result.returncode == 0:
+                SambaUserManager.get_users.cache_clear()
                 return True, f"User '{username}' deleted successfully"
             else:
                 return False, f"Failed to delete user: {result.stderr}"
         
+        except subprocess.TimeoutExpired:
+            return False, f"Timed out after {CMD_TIMEOUT}s running smbpasswd"
         except Exception as e:
             return False, f"Error deleting user: {str(e)}"
 
@@ -1487,129 +1994,281 @@ class SambaUserManager:
 # Mount Management
 # =============================================================================
 
+# Serializes fstab rewrites and the fstab.bak link between request threads
+_FSTAB_LOCK = threading.RLock()
+
+def backup_fstab():
+    """Make FSTAB.bak a hardlink to the current fstab
+    
+    Only valid because fstab is always replaced with os.replace(), never
+    modified in place: the backup keeps the old inode.
+    """
+    backup_path = f"{FSTAB}.bak"
+    with _FSTAB_LOCK:
+        try:
+            os.unlink(backup_path)
+        except FileNotFoundError:
+            pass
+        try:
+            os.link(FSTAB, backup_path)
+        except OSError:
+            # Filesystems without hardlinks get a real copy
+            shutil.copy2(FSTAB, backup_path)
+
+# Filesystem types handled as network shares, lower case
+_CIFS_FSTYPES = frozenset({'cifs', 'smb', 'smb3', 'smb2', 'smbfs'})
+
+# The same as the kernel spells them in /proc/mounts (always lower case)
+_PROC_CIFS_FSTYPES = frozenset(fstype.encode() for fstype in _CIFS_FSTYPES)
+
+# spec, file, vfstype and options of a CIFS/SMB fstab line
+_FSTAB_RE = re.compile(
+    r'^\s*([^\s#]\S*)\s+(\S+)\s+(' + '|'.join(sorted(_CIFS_FSTYPES)) + r')\s+(\S+)', re.IGNORECASE)
+
+# credentials=<file> mount option
+_CREDS_RE = re.compile(r'(?:^|,)credentials=([^,]+)')
+
+# Runs of characters kept out of generated credentials file names
+_CREDS_SANITIZE = re.compile(r'[^A-Za-z0-9]+')
+
+# CIFS/SMB rows of /etc/fstab keyed by (path, st_mtime_ns, st_size) - re-tokenized only on change
+_FSTAB_CACHE: Optional[Tuple[str, int, int, List[Tuple[str, str, str, str, Optional[str]]]]] = None
+
+def load_fstab_entries() -> List[Tuple[str, str, str, str, Optional[str]]]:
+    """Return (remote, mountpoint, fstype, options, credentials file) for each CIFS/SMB line of FSTAB
+    
+    The returned list is shared between callers and must not be modified.
+    """
+    global _FSTAB_CACHE
+    
+    st = os.stat(FSTAB)
+    if _FSTAB_CACHE and _FSTAB_CACHE[:3] == (FSTAB, st.st_mtime_ns, st.st_size):
+        return _FSTAB_CACHE[3]
+    
+    entries = []
+    with open(FSTAB, 'r', encoding='utf-8', errors='replace') as f:
+        for line in f:
+            # Blank, comment and non-CIFS lines simply don't match
+            match = _FSTAB_RE.match(line)
+            if match is None:
+                continue
+            
+            remote, mountpoint, fstype, options = match.groups()
+            creds = _CREDS_RE.search(options)
+            entries.append((_html_inert(remote), _html_inert(mountpoint), sys.intern(fstype),
+                            options, creds[1] if creds else None))
+    
+    _FSTAB_CACHE = (FSTAB, st.st_mtime_ns, st.st_size, entries)
+    return entries
+
+def invalidate_fstab_cache():
+    """Forget the parsed fstab after we rewrote it (mtime may not tick within one write)"""
+    global _FSTAB_CACHE
+    _FSTAB_CACHE = None
+
 class MountManager:
     """Manages CIFS/SMB mounts"""
     
     @staticmethod
-    def get_active_mounts() -> Dict[str, bool]:
-        """Get dictionary of active mount points"""
-        active = {}
+    @ttl_cache(seconds=1)
+    def get_active_mounts() -> Set[str]:
+        """Get the set of active CIFS/SMB mount points
+        
+        procfs reports no meaningful mtime for /proc/mounts, so the result is
+        reused for one second instead of being keyed on the file.
+        """
+        active = set()
         try:
-            with open('/proc/mounts', 'r') as f:
-                for line in f:
-                    parts = line.split()
-                    if len(parts) >= 3 and parts[2].lower() in ('cifs', 'smb', 'smb3', 'smb2', 'smbfs'):
-                        active[parts[1]] = True
+            # Read to EOF explicitly: procfs may hand the table out one page per read()
+            chunks = []
+            fd = os.open('/proc/mounts', os.O_RDONLY | os.O_CLOEXEC)
+            try:
+                while chunk := os.read(fd, 65536):
+                    chunks.append(chunk)
+            finally:
+                os.close(fd)
+            
+            for line in b''.join(chunks).split(b'\n'):
+                parts = line.split(None, 3)
+                if len(parts) >= 3 and parts[2] in _PROC_CIFS_FSTYPES:
+                    active.add(os.fsdecode(parts[1]))
         except Exception as e:
-            print(f"Error reading mounts: {e}")
+            logger.error("Error reading mounts: %s", e)
         return active
     
+    @staticmethod
+    def get_credential_files() -> set:
+        """Names of the files in CREDENTIALS_DIR, read with a single directory scan"""
+        try:
+            with os.scandir(CREDENTIALS_DIR) as it:
+                return {entry.name for entry in it if entry.is_file()}
+        except OSError:
+            return set()
+    
+    @staticmethod
+    def iter_fstab_mounts() -> Iterator[CifsMount]:
+        """Yield CIFS/SMB mounts from /etc/fstab with their current mount and credentials state"""
+        entries = load_fstab_entries()
+        if not entries:
+            return  # No CIFS rows, so /proc/mounts is not worth reading
+        
+        active = MountManager.get_active_mounts()
+        cred_files = None  # Snapshot of CREDENTIALS_DIR, taken on first use
+        
+        for remote, mountpoint, fstype, options, creds_file in entries:
+            creds_exists = False
+            if creds_file:
+                if os.path.dirname(creds_file) == CREDENTIALS_DIR:
+                    if cred_files is None:
+                        cred_files = MountManager.get_credential_files()
+                    creds_exists = os.path.basename(creds_file) in cred_files
+                else:
+                    creds_exists = os.path.isfile(creds_file)
+            
+            yield CifsMount(
+                remote=remote,
+                mountpoint=mountpoint,
+                fstype=fstype,
+                options=options,
+                credentials_file=creds_file,
+                credentials_file_exists=creds_exists,
+                is_mounted=mountpoint in active
+            )
+    
     @staticmethod
     def get_fstab_mounts() -> List[CifsMount]:
         """Get CIFS/SMB mounts from /etc/fstab"""
-        mounts = []
-        active = MountManager.get_active_mounts()
-        
         try:
-            with open(FSTAB, 'r', encoding='utf-8', errors='replace') as f:
-                for line in f:
-                    line = line.strip()
-                    if not line or line.startswith('#'):
-                        continue
-                    
-                    parts = line.split()
-                    if len(parts) >= 4 and parts[2].lower() in ('cifs', 'smb', 'smb3', 'smb2', 'smbfs'):
-                        # Parse credentials file from options
-                        creds_file = None
-                        if 'credentials=' in parts[3]:
-                            for opt in parts[3].split(','):
-                                if opt.startswith('credentials='):
-                                    creds_file = opt.split('=', 1)[1]
-                                    break
-                        
-                        mount = CifsMount(
-                            remote=parts[0],
-                            mountpoint=parts[1],
-                            fstype=parts[2],
-                            options=parts[3],
-                            credentials_file=creds_file,
-                            is_mounted=parts[1] in active
-                        )
-                        mounts.append(mount)
+            return list(MountManager.iter_fstab_mounts())
         except Exception as e:
-            print(f"Error reading fstab: {e}")
-        
-        return mounts
+            logger.error("Error reading fstab: %s", e)
+            return []
     
     @staticmethod
     def add_mount(remote: str, mountpoint: str, fstype: str = 'cifs', 
                   username: str = '', password: str = '', options: str = '') -> Tuple[bool, str]:
         """Add a new mount to /etc/fstab"""
+        return MountManager.add_mounts([{
+            'remote': remote, 'mountpoint': mountpoint, 'fstype': fstype,
+            'username': username, 'password': password, 'options': options
+        }])
+    
+    @staticmethod
+    def add_mounts(entries: List[dict]) -> Tuple[bool, str]:
+        """Add several mounts (add_mount() arguments as dicts) with a single fstab rewrite"""
+        created = []  # Directories and credentials files made here, removed again on failure
         try:
-            # Create mount point if doesn't exist
-            Path(mountpoint).mkdir(parents=True, exist_ok=True, mode=0o755)
+            lines = [MountManager._fstab_entry(created, **entry) for entry in entries]
             
-            # Handle credentials
-            creds_file = None
-            if username and password:
-                # Create credentials file
-                creds_filename = f"creds_{mountpoint.replace('/', '_')}.txt"
-                creds_file = os.path.join(CREDENTIALS_DIR, creds_filename)
-                
-                with open(creds_file, 'w') as f:
-                    f.write(f"username={username}\n")
-                    f.write(f"password={password}\n")
-                
-                os.chmod(creds_file, 0o600)
+            with _FSTAB_LOCK:
+                # Backup fstab
+                backup_fstab()
                 
-                # Add credentials option
-                if options:
-                    options = f"{options},credentials={creds_file}"
-                else:
-                    options = f"credentials={creds_file}"
-            
-            # Default options if none provided
-            if not options:
-                options = "_netdev,nofail"
-            elif '_netdev' not in options:
-                options = f"{options},_netdev,nofail"
-            
-            # Backup fstab
-            shutil.copy2(FSTAB, f"{FSTAB}.bak")
-            
-            # Add entry to fstab
-            with open(FSTAB, 'a') as f:
-                f.write(f"\n# Added by Samba Control Center - {datetime.now()}\n")
-                f.write(f"{remote}\t{mountpoint}\t{fstype}\t{options}\t0 0\n")
+                # Add entries to fstab (as a new file, so the hardlinked backup keeps the old one);
+                # surrogateescape carries non-UTF-8 bytes in other entries through unchanged
+                atomic_write(FSTAB, read_text(FSTAB, 'surrogateescape') + ''.join(lines), 'surrogateescape')
+                invalidate_fstab_cache()
             
-            return True, f"Mount added successfully"
+            if len(entries) == 1:
+                return True, "Mount added successfully"
+            return True, f"{len(entries)} mounts added successfully"
         
         except Exception as e:
+            # Don't leave secrets behind for mounts that never made it into fstab
+            for path in reversed(created):
+                try:
+                    if os.path.isdir(path):
+                        os.rmdir(path)
+                    else:
+                        os.unlink(path)
+                except OSError:
+                    pass
             return False, f"Error adding mount: {str(e)}"
     
+    @staticmethod
+    def _fstab_entry(created: List[str], remote: str, mountpoint: str, fstype: str = 'cifs',
+                     username: str = '', password: str = '', options: str = '') -> str:
+        """Prepare mount point and credentials for a new mount and return its fstab lines
+        
+        Every directory or file this creates is appended to created.
+        """
+        # Create mount point if doesn't exist
+        mount_dir = Path(mountpoint)
+        missing = [d for d in (mount_dir, *mount_dir.parents) if not d.exists()]
+        mount_dir.mkdir(parents=True, exist_ok=True, mode=0o755)
+        created.extend(str(d) for d in reversed(missing))
+        
+        # Handle credentials
+        creds_file = None
+        if username and password:
+            # Create credentials file
+            # The hash keeps /mnt/a-b and /mnt/a_b from sharing (and overwriting) one file
+            safe_name = _CREDS_SANITIZE.sub('_', mountpoint).strip('_') or 'root'
+            digest = hashlib.sha1(mountpoint.encode()).hexdigest()[:8]
+            creds_filename = f"creds_{safe_name}_{digest}.txt"
+            creds_file = os.path.join(CREDENTIALS_DIR, creds_filename)
+            
+            # Created as 0600, so the password is never readable by others;
+            # fchmod tightens a file left over from an earlier mount
+            existed = os.path.exists(creds_file)
+            fd = os.open(creds_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_CLOEXEC, 0o600)
+            if not existed:
+                created.append(creds_file)
+            os.fchmod(fd, 0o600)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(f"username={username}\npassword={password}\n".encode())
+            
+            # Add credentials option
+            if options:
+                options = f"{options},credentials={creds_file}"
+            else:
+                options = f"credentials={creds_file}"
+        
+        # Default options if none provided
+        if not options:
+            options = "_netdev,nofail"
+        elif '_netdev' not in options:
+            options = f"{options},_netdev,nofail"
+        
+        return (f"\n# Added by Samba Control Center - {datetime.now()}\n"
+                f"{remote}\t{mountpoint}\t{fstype}\t{options}\t0 0\n")
+    
     @staticmethod
     def delete_mount(mountpoint: str) -> Tuple[bool, str]:
         """Remove a mount from /etc/fstab"""
         try:
-            # Backup fstab
-            shutil.copy2(FSTAB, f"{FSTAB}.bak")
-            
-            # Read fstab and filter out the mount
-            with open(FSTAB, 'r') as f:
-                lines = f.readlines()
-            
-            # Write back without the mount
-            with open(FSTAB, 'w') as f:
-                skip_next_comment = False
-                for line in lines:
-                    if mountpoint in line and not line.strip().startswith('#'):
-                        skip_next_comment = True
-                        continue
-                    if skip_next_comment and line.strip().startswith('# Added by Samba Control Center'):
-                        skip_next_comment = False
-                        continue
-                    f.write(line)
-            
+            with _FSTAB_LOCK:
+                # Backup fstab
+                backup_fstab()
+                
+                # Copy fstab to a temp file in one pass, leaving out the mount and the
+                # "# Added by" comment (plus its blank separator) written above it
+                with open(FSTAB, 'r', encoding='utf-8', errors='surrogateescape') as src, \
+                        atomic_writer(FSTAB, 'surrogateescape') as dst:
+                    held = []  # Blank and marker lines not yet known to belong to a kept entry
+                    for line in src:
+                        stripped = line.strip()
+                        if not stripped or stripped.startswith('# Added by Samba Control Center'):
+                            held.append(line)
+                            continue
+                        
+                        parts = line.split()
+                        if (len(parts) >= 3 and parts[1] == mountpoint and parts[0][0] != '#'
+                                and parts[2].lower() in _CIFS_FSTYPES):
+                            if held and held[-1].strip():
+                                held.pop()
+                                if held and not held[-1].strip():
+                                    held.pop()
+                            dst.writelines(held)
+                            held = []
+                            continue
+                        
+                        dst.writelines(held)
+                        held = []
+                        dst.write(line)
+                    dst.writelines(held)
+                invalidate_fstab_cache()
+                
             return True, f"Mount removed from fstab"
         
         except Exception as e:
@@ -1664,34 +2323,47 @@ class SystemManager:
     """System-level operations"""
     
     @staticmethod
+    @ttl_cache(seconds=2)
     def get_system_info() -> dict:
         """Get system information"""
         info = {
             'hostname': 'localhost',
             'current_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            'smbd_running': False
+            'smbd_running': False,
+            'samba_version': SystemManager.get_samba_version()
         }
         
         try:
-            # Get hostname
-            result = subprocess.run(['hostname'], capture_output=True, text=True, check=False)
-            if result.returncode == 0:
-                info['hostname'] = result.stdout.strip()
-            
-            # Check if smbd is running
+            # socket.gethostname() needs no process, so only the smbd state spawns one
+            info['hostname'] = socket.gethostname()
             result = subprocess.run(
-                ['systemctl', 'is-active', 'smbd'],
+                ['systemctl', 'is-active', '--quiet', 'smbd'],
                 capture_output=True,
-                text=True,
-                check=False
+                check=False,
+                timeout=CMD_TIMEOUT
             )
             info['smbd_running'] = result.returncode == 0
         
+        except subprocess.TimeoutExpired:
+            # A hung systemd answers nothing, so smbd is reported as not running
+            logger.warning("systemctl did not answer within %ss", CMD_TIMEOUT)
         except Exception as e:
-            print(f"Error getting system info: {e}")
+            logger.error("Error getting system info: %s", e)
         
         return info
     
+    @staticmethod
+    @functools.lru_cache(maxsize=1)
+    def get_samba_version() -> str:
+        """Installed Samba version (probed once per process)"""
+        try:
+            result = subprocess.run(['smbd', '-V'], capture_output=True, text=True, check=False)
+            if result.returncode == 0:
+                return result.stdout.strip().replace('Version ', '', 1)
+        except Exception as e:
+            logger.error("Error getting Samba version: %s", e)
+        return ''
+    
     @staticmethod
     def restart_smbd() -> Tuple[bool, str]:
         """Restart the Samba service"""
@@ -1734,33 +2406,49 @@ class SystemManager:
 # Flask Routes
 # =============================================================================
 
+# Runs the dashboard's independent subprocess-backed loaders side by side
+# (two per page load, so two concurrent dashboards never queue behind each other)
+_PROBE_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix='scc-probe')
+
+def load_dashboard_state() -> Tuple[List[SambaShare], List[SambaUser], List[CifsMount], dict]:
+    """Shares, users, mounts and system info for the dashboard and /api/state"""
+    # pdbedit and systemctl wait on subprocesses, so they overlap; shares and
+    # mounts come from stat()-validated caches and are cheaper than a pool hop
+    users_future = _PROBE_POOL.submit(SambaUserManager.get_users)
+    system_future = _PROBE_POOL.submit(SystemManager.get_system_info)
+    shares = SambaConfig().get_shares()
+    mounts = MountManager.get_fstab_mounts()
+    return shares, users_future.result(), mounts, system_future.result()
+
+# flask_compress sends a strong "<etag>:<encoding>" for every compressed body
+_ETAG_ENCODINGS = ('br', 'gzip', 'zstd', 'deflate')
+
+def not_modified(etag: str) -> Optional[Response]:
+    """A 304 if If-None-Match names etag, bare or in one of its encoded variants"""
+    for tag in (etag, *(f"{etag}:{encoding}" for encoding in _ETAG_ENCODINGS)):
+        if request.if_none_match.contains_weak(tag):
+            response = Response(status=304)
+            response.set_etag(tag)
+            return response
+    return None
+
+def state_etag(shares, users, mounts, system_info, smb_version: str = DEFAULT_SMB_VERSION) -> str:
+    """Validator for everything the dashboard shows except the clock"""
+    state = (VERSION, ASSET_URLS, smb_version, shares, users, mounts,
+             system_info['hostname'], system_info['smbd_running'], system_info['samba_version'])
+    return hashlib.blake2b(repr(state).encode(), digest_size=16).hexdigest()
+
+# Last rendered dashboard without flash messages: ((etag, clock), html)
+_PAGE_CACHE: Optional[Tuple[Tuple[str, str], str]] = None
+
 @app.route('/', methods=['GET', 'POST'])
 def index():
     """Main page"""
+    global _PAGE_CACHE
     
-    # Load configurations
-    samba_config = SambaConfig()
-    samba_config.load()
-    
-    shares = samba_config.get_shares()
-    users = SambaUserManager.get_users()
-    mounts = MountManager.get_fstab_mounts()
-    system_info = SystemManager.get_system_info()
-    
-    # Debug output
-    if app.config['DEBUG']:
-        print(f"DEBUG: Loaded {len(shares)} shares, {len(users)} users, {len(mounts)} mounts")
-    
-    # Statistics
-    stats = {
-        'shares': len(shares),
-        'users': len(users),
-        'fstab_mounts': len(mounts),
-        'active_mounts': sum(1 for m in mounts if m.is_mounted)
-    }
-    
-    # Handle POST actions
+    # Handle POST actions; they redirect, so the dashboard state is only loaded for GET
     if request.method == 'POST':
+        samba_config = SambaConfig()
         action = request.form.get('action', '')
         
         # Samba Share Actions
@@ -1776,6 +2464,8 @@ def index():
             
             if not share.name or not share.path:
                 flash('Share name and path are required', 'danger')
+            elif not _single_line(share.valid_users):
+                flash('Valid users must be a single line without control characters', 'danger')
             else:
                 # Create directory if doesn't exist
                 try:
@@ -1850,14 +2540,17 @@ def index():
         # System Actions
         elif action == 'apply_mounts':
             try:
+                # -F forks one mount per filesystem, so slow CIFS handshakes overlap.
+                # It drops mount(8)'s ordering, so only the CIFS entries this tool
+                # manages take part; root, bind and nested mounts are left alone.
                 result = subprocess.run(
-                    ['mount', '-a'],
+                    ['mount', '-a', '-F', '-t', ','.join(sorted(_CIFS_FSTYPES))],
                     capture_output=True,
                     text=True,
                     check=False
                 )
                 if result.returncode == 0:
-                    flash('All mounts from /etc/fstab applied successfully! (mount -a)', 'success')
+                    flash('All CIFS/SMB mounts from /etc/fstab applied successfully! (mount -a -F -t cifs,...)', 'success')
                 else:
                     flash(f'Some mounts failed:\n{result.stderr}', 'danger')
             except Exception as e:
@@ -1879,26 +2572,244 @@ def index():
             flash(message, 'success' if success else 'danger')
         
         # Reload data after action
+        invalidate_cmd_cache()
         return redirect(url_for('index'))
     
-    # Render template
-    return render_template_string(
-        HTML_TEMPLATE,
-        shares=shares,
-        users=users,
-        mounts=mounts,
-        system_info=system_info,
-        stats=stats,
-        config_content=samba_config.get_config_content()
+    # Load configurations
+    shares, users, mounts, system_info = load_dashboard_state()
+    
+    logger.debug("Loaded %d shares, %d users, %d mounts", len(shares), len(users), len(mounts))
+    
+    # Statistics
+    stats = {
+        'shares': len(shares),
+        'users': len(users),
+        'fstab_mounts': len(mounts),
+        'active_mounts': sum(1 for m in mounts if m.is_mounted)
+    }
+    
+    # The page is a function of this state (plus the clock); unchanged state revalidates to a 304.
+    # Pending flash messages are one-shot, so those pages are never validated.
+    smb_version = request.cookies.get('smb_version', DEFAULT_SMB_VERSION)
+    if smb_version not in SMB_SELECTOR_HTML:
+        smb_version = DEFAULT_SMB_VERSION
+    
+    etag = None
+    if '_flashes' not in session:
+        etag = state_etag(shares, users, mounts, system_info, smb_version)
+        response = not_modified(etag)
+        if response:
+            return response
+    
+    # Same state and same (cached) clock reading render the same bytes
+    page_key = (etag, system_info['current_time'])
+    if etag and _PAGE_CACHE and _PAGE_CACHE[0] == page_key:
+        html = _PAGE_CACHE[1]
+    else:
+        context = {
+            **_STATIC_CTX,
+            'shares': shares,
+            'users': users,
+            'mounts': mounts,
+            'system_info': system_info,
+            'stats': stats,
+            'smb_selector_html': SMB_SELECTOR_HTML[smb_version],
+            'share_rows': render_share_rows(shares),
+            'user_rows': render_user_rows(users),
+            'mount_rows': render_mount_rows(mounts)
+        }
+        html = render_template('index.html', **context)
+        if etag:
+            _PAGE_CACHE = (page_key, html)
+    
+    response = Response(html, mimetype='text/html')
+    if etag:
+        response.set_etag(etag)
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+    return response
+
+def json_dumps(obj) -> bytes:
+    """Encode obj as compact JSON bytes, using orjson when it is installed
+    
+    The models can be passed as-is: orjson serializes dataclasses natively, the
+    stdlib fallback goes through their to_dict().
+    """
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(',', ':'), default=lambda o: o.to_dict()).encode()
+
+def ojsonify(obj, status: int = 200) -> Response:
+    """jsonify() replacement backed by json_dumps()"""
+    return Response(json_dumps(obj), status=status, mimetype='application/json')
+
+@app.route('/assets/<name>')
+def asset(name):
+    """Serve an embedded static asset with validators so browsers can cache it"""
+    # Fingerprinted names are what the pages link to; plain names stay available for old links
+    fingerprinted = name in ASSET_FINGERPRINTS
+    name = ASSET_FINGERPRINTS.get(name, name)
+    if name not in STATIC_ASSETS:
+        abort(404)
+    
+    body, mimetype, etag, gzipped = STATIC_ASSETS[name]
+    if 'gzip' in request.accept_encodings:
+        response = Response(gzipped, mimetype=mimetype)
+        response.headers['Content-Encoding'] = 'gzip'
+        etag += '-gz'
+    else:
+        response = Response(body, mimetype=mimetype)
+    response.vary.add('Accept-Encoding')
+    response.set_etag(etag)
+    response.cache_control.public = True
+    if fingerprinted:
+        response.cache_control.max_age = 31536000
+        response.cache_control.immutable = True
+    else:
+        response.cache_control.max_age = 86400
+    return response.make_conditional(request)
+
+@app.route('/config/raw')
+def config_raw():
+    """Raw smb.conf for the config viewer, sent straight from disk with 304 support"""
+    try:
+        response = send_file(SMB_CONF, mimetype='text/plain', conditional=True, max_age=0)
+    except FileNotFoundError:
+        return Response(f"Config file not found: {SMB_CONF}", status=404, mimetype='text/plain')
+    response.cache_control.private = True
+    return response
+
+@app.route('/mounts/bulk', methods=['POST'])
+def mounts_bulk():
+    """Add several mounts at once from a JSON list of {remote, mountpoint, fstype, username, password, options}"""
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, list) or not payload:
+        return ojsonify({'success': False, 'message': 'Expected a non-empty JSON list of mounts'}, 400)
+    
+    entries = []
+    for item in payload:
+        if not isinstance(item, dict):
+            return ojsonify({'success': False, 'message': 'Each mount must be a JSON object'}, 400)
+        entry = {key: str(item.get(key) or '').strip()
+                 for key in ('remote', 'mountpoint', 'fstype', 'username', 'password', 'options')}
+        entry['fstype'] = entry['fstype'] or 'cifs'
+        if not entry['remote'] or not entry['mountpoint']:
+            return ojsonify({'success': False, 'message': 'Remote path and mount point are required'}, 400)
+        entries.append(entry)
+    
+    success, message = MountManager.add_mounts(entries)
+    invalidate_cmd_cache()
+    return ojsonify({'success': success, 'message': message}, 200 if success else 500)
+
+# Serialized /api/shares body, keyed by the smb.conf (st_mtime_ns, st_size) it was built from
+_SHARES_JSON_CACHE = {'key': None, 'body': b''}
+
+@app.route('/api/shares')
+def api_shares():
+    """Configured shares as JSON"""
+    try:
+        st = os.stat(SMB_CONF)
+    except OSError as e:
+        return ojsonify({'error': f"Failed to read config: {str(e)}"}, 500)
+    
+    key = (st.st_mtime_ns, st.st_size)
+    etag = '%x-%x' % key
+    response = not_modified(etag)
+    if response:
+        return response
+    
+    if _SHARES_JSON_CACHE['key'] != key:
+        shares = SambaConfig().get_shares()
+        _SHARES_JSON_CACHE['body'] = json_dumps(shares)
+        _SHARES_JSON_CACHE['key'] = key
+    
+    response = Response(_SHARES_JSON_CACHE['body'], mimetype='application/json')
+    response.set_etag(etag)
+    return response
+
+@app.route('/api/state')
+def api_state():
+    """Everything on the dashboard as one JSON document, revalidated with the dashboard's ETag"""
+    shares, users, mounts, system_info = load_dashboard_state()
+    etag = state_etag(shares, users, mounts, system_info)
+    response = not_modified(etag)
+    if response:
+        return response
+    
+    response = ojsonify({
+        'shares': shares,
+        'users': users,
+        'mounts': mounts,
+        'system': {
+            'hostname': system_info['hostname'],
+            'smbd_running': system_info['smbd_running'],
+            'samba_version': system_info['samba_version']
+        }
+    })
+    response.set_etag(etag)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+@app.route('/api/users')
+def api_users():
+    """Samba users as JSON"""
+    return ojsonify(SambaUserManager.get_users())
+
+@app.route('/api/mounts')
+def api_mounts():
+    """CIFS/SMB fstab entries with their mount state as JSON"""
+    return ojsonify(MountManager.get_fstab_mounts())
+
+# =============================================================================
+# Response Compression
+# =============================================================================
+
+COMPRESS_MIMETYPES = ['text/html', 'text/css', 'application/javascript', 'application/json', 'image/svg+xml']
+COMPRESS_LEVEL = 6
+COMPRESS_MIN_SIZE = 500
+
+if Compress is not None:
+    app.config.update(
+        COMPRESS_MIMETYPES=COMPRESS_MIMETYPES,
+        COMPRESS_LEVEL=COMPRESS_LEVEL,
+        COMPRESS_MIN_SIZE=COMPRESS_MIN_SIZE,
+        COMPRESS_ALGORITHM=['br', 'gzip']
     )
+    Compress(app)
+else:
+    @app.after_request
+    def gzip_response(response: Response) -> Response:
+        """Gzip text responses for clients that accept it (fallback without flask-compress)"""
+        if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in COMPRESS_MIMETYPES
+                or 'gzip' not in request.accept_encodings):
+            return response
+        
+        body = response.get_data()
+        if len(body) < COMPRESS_MIN_SIZE:
+            return response
+        
+        response.set_data(gzip.compress(body, COMPRESS_LEVEL))
+        response.headers['Content-Encoding'] = 'gzip'
+        response.vary.add('Accept-Encoding')
+        # The encoded body differs byte-for-byte from the identity one
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
 
 # =============================================================================
 # Main Entry Point
 # =============================================================================
 
 if __name__ == '__main__':
+    logging.basicConfig(level=logging.DEBUG if app.config['DEBUG'] else logging.WARNING,
+                        format='%(asctime)s %(levelname)s %(message)s')
+    
     print("=" * 80)
-    print("🔒 SAMBA CONTROL CENTER v2.0")
+    print(f"🔒 SAMBA CONTROL CENTER v{VERSION}")
     print("=" * 80)
     print(f"📁 Config: {SMB_CONF}")
     print(f"💾 Backups: {BACKUP_DIR}")
@@ -1912,6 +2823,9 @@ if __name__ == '__main__':
         print("   Some operations may fail without sudo privileges.")
         print()
     
+    # --dev (or a missing waitress) falls back to Flask's built-in server
+    dev_server = '--dev' in sys.argv[1:] or waitress_serve is None
+    
     # Try multiple ports
     ports = [5000, 5001, 5050, 8000]
     for port in ports:
@@ -1919,7 +2833,12 @@ if __name__ == '__main__':
             print(f"🚀 Starting server on port {port}...")
             print(f"🌐 Access at: http://localhost:{port}")
             print("=" * 80)
-            app.run(host='0.0.0.0', port=port, debug=False)
+            if dev_server:
+                # Threaded: requests waiting on pdbedit/smbpasswd don't block the others
+                app.run(host='0.0.0.0', port=port, debug=False, threaded=True)
+            else:
+                # One process, so the in-memory caches are shared by all worker threads
+                waitress_serve(app, host='0.0.0.0', port=port, threads=8)
             break
         except OSError as e:
             if 'Address already in use' in str(e):
@@ -1930,8 +2849,7 @@ if __name__ == '__main__':
             print("\n\n👋 Shutting down gracefully...")
             sys.exit(0)
         except Exception as e:
-            print(f"❌ Fatal error: {e}")
-            traceback.print_exc()
+            logger.exception("Fatal error: %s", e)
             sys.exit(1)
     else:
         print("❌ Could not find an available port. Exiting.")